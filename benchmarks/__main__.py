@@ -0,0 +1,43 @@
+import sys
+import json
+import argparse
+
+from benchmarks.common import save_results, find_regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run all benchmarks and save the results as JSON")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown against the baseline")
+    parser.add_argument("--iterations", type=int, default=20, help="iterations per microbenchmark")
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--skip-api", action="store_true", help="only run the microbenchmarks")
+    args = parser.parse_args()
+
+    results = {}
+    # first, so its settings are in the environment before anything imports src
+    if not args.skip_api:
+        from benchmarks import bench_api
+        results["api"] = bench_api.run(args.requests, args.concurrency, args.latency, args.jitter)
+
+    from benchmarks import bench_docx, bench_docx_text, bench_micro
+
+    results.update(
+        docx=bench_docx.run(args.iterations),
+        docx_text=bench_docx_text.run(args.iterations),
+        micro=bench_micro.run(args.iterations),
+    )
+
+    save_results(results, args.output)
+    print(json.dumps(results, indent=2))
+    print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        regressions = find_regressions(results, args.baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import itertools
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_llm import create_app, free_port, serve_in_thread
+
+JOB_DESCRIPTION = """Senior Software Engineer
+
+Requirements:
+- Python, FastAPI, PostgreSQL
+- CI/CD pipelines and cross-functional collaboration
+"""
+
+JOB_ENDPOINTS = ("tailor", "cover-letter", "generate")
+POLL_INTERVAL = 0.02
+
+
+def configure(workdir: str, llm_url: str) -> None:
+    # src modules read their settings at import time, so this runs before importing src.api
+    os.environ.update(
+        OPENAI_API_KEY="benchmark",
+        OPENAI_BASE_URL=llm_url,
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        BLOB_DIR=f"{workdir}/blobs",
+    )
+
+
+async def wait_for_job(client: httpx.AsyncClient, job_id: str) -> dict:
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def run_job(client: httpx.AsyncClient, resume_id: int, endpoint: str, job_description: str) -> bool:
+    response = await client.post(
+        f"/resumes/{resume_id}/{endpoint}",
+        params={"regenerate": "true"},
+        content=job_description,
+        headers={"content-type": "text/plain"}
+    )
+    if response.status_code != 202:
+        return False
+    return (await wait_for_job(client, response.json()["job_id"]))["status"] == "completed"
+
+
+async def run_stream(client: httpx.AsyncClient, resume_id: int, job_description: str) -> bool:
+    async with client.stream(
+        "POST",
+        f"/resumes/{resume_id}/tailor/stream",
+        params={"regenerate": "true"},
+        content=job_description,
+        headers={"content-type": "text/plain"}
+    ) as response:
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+        return event == "done"
+
+
+async def scenario(requests: int, concurrency: int, call) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await call(i)
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                timings.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    stats = summarize(timings) if timings else {"count": 0}
+    return {**stats, "errors": errors, "throughput_rps": round(len(timings) / elapsed, 2)}
+
+
+async def run_benchmarks(base_url: str, requests: int, concurrency: int) -> dict:
+    corpus = build_corpus()
+    results = {}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        async def upload(i: int) -> bool:
+            document = corpus[i % len(corpus)]
+            response = await client.post("/upload", files={"file": (document["filename"], document["content"])})
+            return response.status_code == 200
+
+        results["upload"] = await scenario(requests, concurrency, upload)
+
+        resume_ids = {}
+        for document in corpus:
+            response = await client.post("/upload", files={"file": (document["filename"], document["content"])})
+            resume_ids[document["filename"]] = response.json()["id"]
+
+        # the first job per document includes text extraction (and vision calls for scans)
+        results["tailor_cold"] = {}
+        for filename, resume_id in resume_ids.items():
+            start = time.perf_counter()
+            ok = await run_job(client, resume_id, "tailor", JOB_DESCRIPTION)
+            results["tailor_cold"][filename] = {
+                **summarize([(time.perf_counter() - start) * 1000]), "errors": 0 if ok else 1
+            }
+
+        ids = list(resume_ids.values())
+        counter = itertools.count()
+
+        def job_description() -> str:
+            # unique per request so nothing is served from the result cache
+            return f"{JOB_DESCRIPTION}\nRequisition {next(counter)}"
+
+        for endpoint in JOB_ENDPOINTS:
+            results[endpoint] = await scenario(
+                requests, concurrency,
+                lambda i, endpoint=endpoint: run_job(client, ids[i % len(ids)], endpoint, job_description())
+            )
+
+        results["tailor_stream"] = await scenario(
+            requests, concurrency, lambda i: run_stream(client, ids[i % len(ids)], job_description())
+        )
+
+        async def download(i: int) -> bool:
+            response = await client.get(f"/resumes/{ids[i % len(ids)]}/download")
+            return response.status_code == 200
+
+        results["download"] = await scenario(requests, concurrency, download)
+
+    return results
+
+
+def run(requests: int, concurrency: int, latency: float, jitter: float) -> dict:
+    llm_port = free_port()
+    llm_server = serve_in_thread(create_app(latency, jitter), llm_port)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure(workdir, f"http://127.0.0.1:{llm_port}/v1")
+        from src.api import app
+
+        api_port = free_port()
+        api_server = serve_in_thread(app, api_port)
+        try:
+            results = asyncio.run(run_benchmarks(f"http://127.0.0.1:{api_port}", requests, concurrency))
+        finally:
+            api_server.should_exit = True
+            llm_server.should_exit = True
+            # let the app's lifespan shut down before its working directory is removed
+            time.sleep(1)
+
+    return {
+        "config": {"requests": requests, "concurrency": concurrency, "llm_latency_s": latency, "llm_jitter_s": jitter},
+        **results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end API benchmark against a fake model server")
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.concurrency, args.latency, args.jitter), indent=2))
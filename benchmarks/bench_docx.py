@@ -0,0 +1,71 @@
+import io
+import json
+import time
+import argparse
+
+from docx import Document
+
+from benchmarks.common import measure
+from benchmarks.legacy_docx import legacy_create_docx, legacy_create_cover_letter_docx
+from src.docx_render import get_template, render_resume, render_cover_letter
+
+SAMPLE_RESUME = {
+    "name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "phone": "+1 555 0100",
+    "location": "Berlin, Germany",
+    "github": "github.com/janedoe",
+    "linkedin": "linkedin.com/in/janedoe",
+    "professional_summary": "Senior Software Engineer with 8 years of experience building data platforms and Application Programming Interfaces (APIs) in Python.",
+    "work_experience": [
+        {
+            "title": f"Senior Software Engineer {i}",
+            "company": f"Company {i}",
+            "duration": f"{2024 - 2 * i} - {2026 - 2 * i}",
+            "bullets": [f"Reduced pipeline latency by {10 + j}% by redesigning the ingestion layer & caching" for j in range(5)]
+        }
+        for i in range(5)
+    ],
+    "projects": [
+        {"name": f"Project {i}", "bullets": ["Built with FastAPI, PostgreSQL and Redis", "Served 10K+ daily users"]}
+        for i in range(3)
+    ],
+    "skills": ["Python", "SQL", "FastAPI", "Docker", "Kubernetes", "CI/CD pipelines", "AWS"],
+    "soft_skills": ["Cross-functional collaboration", "Stakeholder management", "Mentoring"],
+    "education": [{"degree": "BSc Computer Science", "institution": "TU Berlin", "year": "2016"}]
+}
+
+SAMPLE_COVER_LETTER = "\n\n".join(
+    ["Hello,"] + [f"Paragraph {i} about why I'm a great fit for this role. " * 4 for i in range(4)]
+    + ["Yours sincerely,\nJane Doe"]
+)
+
+
+def run(iterations: int) -> dict:
+    start = time.perf_counter()
+    get_template()
+    results = {"template_load_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+    # the rendered files must still open as documents
+    Document(io.BytesIO(render_resume(SAMPLE_RESUME)))
+    Document(io.BytesIO(render_cover_letter(SAMPLE_COVER_LETTER)))
+
+    for name, legacy, fast, arg in (
+        ("resume", legacy_create_docx, render_resume, SAMPLE_RESUME),
+        ("cover_letter", legacy_create_cover_letter_docx, render_cover_letter, SAMPLE_COVER_LETTER),
+    ):
+        legacy_stats = measure(legacy, arg, iterations)
+        fast_stats = measure(fast, arg, iterations)
+        results[name] = {
+            "python_docx": legacy_stats,
+            "template": fast_stats,
+            "speedup": round(legacy_stats["mean_ms"] / fast_stats["mean_ms"], 1),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the template DOCX renderer with the python-docx builder")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
@@ -0,0 +1,43 @@
+import json
+import argparse
+import tracemalloc
+
+from benchmarks.common import measure
+from benchmarks.corpus import docx_resume, designer_docx
+from benchmarks.legacy_docx import legacy_extract_docx_text
+from src.docx_text import extract_docx_text
+
+PAGE_COUNTS = (1, 4, 16, 64)
+
+
+def peak_memory_kib(fn, arg) -> float:
+    tracemalloc.start()
+    try:
+        fn(arg)
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def run(iterations: int, page_counts: tuple[int, ...] = PAGE_COUNTS) -> dict:
+    results = {}
+    for pages in page_counts:
+        for name, content in ((f"resume_{pages}x.docx", docx_resume(pages)), (f"designer_{pages}x.docx", designer_docx(pages))):
+            entry = {"bytes": len(content)}
+            for label, fn in (("python_docx", legacy_extract_docx_text), ("streaming", extract_docx_text)):
+                # chars shows how much of the document each extractor recovers
+                entry[label] = {
+                    **measure(fn, content, iterations),
+                    "chars": len(fn(content)),
+                    "peak_kib": peak_memory_kib(fn, content),
+                }
+            entry["speedup"] = round(entry["python_docx"]["mean_ms"] / entry["streaming"]["mean_ms"], 1)
+            results[name] = entry
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the streaming DOCX text extractor with python-docx")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
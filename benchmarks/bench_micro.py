@@ -0,0 +1,36 @@
+import json
+import asyncio
+import argparse
+
+from benchmarks.common import measure
+from benchmarks.corpus import build_corpus, resume_data
+from src.pdf_render import render_pdf_pages
+from src.pdf_text import extract_page_texts
+from src.resume_processor import read_resume, create_docx
+from src.workers import document_pool
+
+
+def run(iterations: int) -> dict:
+    results = {"render_pdf_pages": {}, "extract_page_texts": {}, "read_resume_docx": {}, "create_docx": {}}
+    try:
+        for document in build_corpus():
+            name, content = document["filename"], document["content"]
+            if document["kind"] == "scanned_pdf":
+                # the rasterization step of extract_pdf_with_vision
+                results["render_pdf_pages"][name] = measure(lambda b: asyncio.run(render_pdf_pages(b)), content, iterations)
+            elif document["kind"] == "text_pdf":
+                results["extract_page_texts"][name] = measure(extract_page_texts, content, iterations)
+            else:
+                results["read_resume_docx"][name] = measure(lambda b: asyncio.run(read_resume(b, name)), content, iterations)
+            if document["kind"] == "docx":
+                results["create_docx"][f"{document['pages']}x"] = measure(lambda d: asyncio.run(create_docx(d)), resume_data(document["pages"]), iterations)
+    finally:
+        document_pool.stop()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks for extraction and rendering")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
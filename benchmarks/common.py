@@ -0,0 +1,58 @@
+import json
+import time
+import platform
+import statistics
+from datetime import datetime, timezone
+
+
+def summarize(timings_ms: list[float]) -> dict:
+    timings = sorted(timings_ms)
+    return {
+        "count": len(timings),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+    }
+
+
+def measure(fn, arg, iterations: int) -> dict:
+    fn(arg)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def save_results(results: dict, path: str) -> None:
+    document = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def _timings(results: dict, prefix: str = ""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            if "p50_ms" in value:
+                yield f"{prefix}{key}", value
+            else:
+                yield from _timings(value, f"{prefix}{key}.")
+
+
+# benchmarks whose p50 grew by more than `threshold` relative to the baseline file
+def find_regressions(results: dict, baseline_path: str, threshold: float) -> list[str]:
+    with open(baseline_path) as f:
+        baseline = dict(_timings(json.load(f)["results"]))
+
+    regressions = []
+    for name, stats in _timings(results):
+        before = baseline.get(name)
+        if before and before["p50_ms"] > 0 and stats["p50_ms"] > before["p50_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {before['p50_ms']}ms -> {stats['p50_ms']}ms")
+    return regressions
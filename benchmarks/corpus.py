@@ -0,0 +1,195 @@
+import io
+import copy
+import zipfile
+import argparse
+import os
+from xml.sax.saxutils import escape
+
+from PIL import Image, ImageDraw
+
+from benchmarks.bench_docx import SAMPLE_RESUME
+from src.docx_render import render_resume
+
+LINES_PER_PAGE = 48
+PAGE_COUNTS = (1, 2, 4)
+
+
+def resume_data(pages: int) -> dict:
+    data = copy.deepcopy(SAMPLE_RESUME)
+    data["work_experience"] = data["work_experience"] * pages
+    return data
+
+
+def resume_lines(pages: int) -> list[str]:
+    data = resume_data(pages)
+    lines = [data["name"], f"{data['email']} | {data['phone']} | {data['location']}", "", "SUMMARY", data["professional_summary"], "", "EXPERIENCE"]
+    for job in data["work_experience"]:
+        lines += [f"{job['title']} - {job['company']} ({job['duration']})"] + [f"- {bullet}" for bullet in job["bullets"]] + [""]
+    lines += ["SKILLS", ", ".join(data["skills"]), "", "EDUCATION"]
+    lines += [f"{edu['degree']}, {edu['institution']}, {edu['year']}" for edu in data["education"]]
+    # pad to the requested page count
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(f"- Additional achievement {len(lines)} delivering measurable results for the team")
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+# a PDF with a real text layer (Helvetica), written by hand to avoid a PDF library dependency
+def text_pdf(pages: int) -> bytes:
+    lines = resume_lines(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        text = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE])
+        stream = f"BT /F1 10 Tf 14 TL 50 760 Td {text} ET".encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+# an image-only PDF, like a scan, so every page goes to the vision model
+def scanned_pdf(pages: int) -> bytes:
+    lines = resume_lines(pages)
+    images = []
+    for page in range(pages):
+        image = Image.new("RGB", (1275, 1650), "white")
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]):
+            draw.text((100, 100 + i * 30), line, fill="black")
+        images.append(image)
+
+    out = io.BytesIO()
+    images[0].save(out, "PDF", resolution=150, save_all=True, append_images=images[1:])
+    return out.getvalue()
+
+
+def docx_resume(pages: int) -> bytes:
+    return render_resume(resume_data(pages))
+
+
+WORD_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:v="urn:schemas-microsoft-com:vml" mc:Ignorable="wps"'
+)
+
+DESIGNER_PARTS = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>'
+        '<Override PartName="/word/footer1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+        '</Relationships>'
+    ),
+    "word/_rels/document.xml.rels": (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" Target="header1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/footer" Target="footer1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _paragraph(text: str) -> str:
+    # tab stops in the properties, as templates have them, must not read as text
+    return f'<w:p><w:pPr><w:tabs><w:tab w:val="right" w:pos="9000"/></w:tabs></w:pPr><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _cell(paragraphs: list[str]) -> str:
+    return "<w:tc>" + "".join(_paragraph(text) for text in paragraphs) + "</w:tc>"
+
+
+def _text_box(paragraphs: list[str]) -> str:
+    content = "<w:txbxContent>" + "".join(_paragraph(text) for text in paragraphs) + "</w:txbxContent>"
+    return (
+        "<w:p><w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires=\"wps\"><w:drawing><wp:anchor><a:graphic><a:graphicData><wps:wsp><wps:txbx>{content}</wps:txbx></wps:wsp></a:graphicData></a:graphic></wp:anchor></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><v:shape><v:textbox>{content}</v:textbox></v:shape></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+
+
+# a designer-template style DOCX: contact details in the page header, the sidebar in a
+# text box, experience laid out in a two-column table and a footer; plain paragraphs
+# hold only the section headings
+def designer_docx(pages: int) -> bytes:
+    data = resume_data(pages)
+    sidebar = ["SKILLS", *data["skills"], "", "CORE COMPETENCIES", *data["soft_skills"]]
+    rows = "".join(
+        "<w:tr>" + _cell([job["duration"]]) + _cell([f"{job['title']}, {job['company']}", *job["bullets"]]) + "</w:tr>"
+        for job in data["work_experience"]
+    )
+    body = (
+        _text_box(sidebar)
+        + _paragraph("SUMMARY") + _paragraph(data["professional_summary"])
+        + _paragraph("EXPERIENCE") + f"<w:tbl>{rows}</w:tbl>"
+        + _paragraph("EDUCATION")
+        + "".join(_paragraph(f"{edu['degree']}, {edu['institution']}, {edu['year']}") for edu in data["education"])
+        + '<w:sectPr><w:headerReference w:type="default" r:id="rId1"/><w:footerReference w:type="default" r:id="rId2"/></w:sectPr>'
+    )
+    contact = [data["name"], f"{data['email']} | {data['phone']} | {data['location']}"]
+    parts = {
+        **DESIGNER_PARTS,
+        "word/document.xml": f"<w:document {WORD_NAMESPACES}><w:body>{body}</w:body></w:document>",
+        "word/header1.xml": f"<w:hdr {WORD_NAMESPACES}>" + "".join(_paragraph(text) for text in contact) + "</w:hdr>",
+        "word/footer1.xml": f"<w:ftr {WORD_NAMESPACES}>" + _paragraph(f"{data['github']} | {data['linkedin']}") + "</w:ftr>",
+    }
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as package:
+        for name, xml in parts.items():
+            package.writestr(name, '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + xml)
+    return out.getvalue()
+
+
+def build_corpus(page_counts: tuple[int, ...] = PAGE_COUNTS) -> list[dict]:
+    corpus = []
+    for pages in page_counts:
+        corpus.append({"filename": f"text_{pages}p.pdf", "kind": "text_pdf", "pages": pages, "content": text_pdf(pages)})
+        corpus.append({"filename": f"scanned_{pages}p.pdf", "kind": "scanned_pdf", "pages": pages, "content": scanned_pdf(pages)})
+        corpus.append({"filename": f"resume_{pages}x.docx", "kind": "docx", "pages": pages, "content": docx_resume(pages)})
+        corpus.append({"filename": f"designer_{pages}x.docx", "kind": "designer_docx", "pages": pages, "content": designer_docx(pages)})
+    return corpus
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the generated benchmark corpus to a directory")
+    parser.add_argument("directory")
+    args = parser.parse_args()
+    os.makedirs(args.directory, exist_ok=True)
+    for document in build_corpus():
+        with open(os.path.join(args.directory, document["filename"]), "wb") as f:
+            f.write(document["content"])
+        print(f"{document['filename']}: {len(document['content'])} bytes")
@@ -0,0 +1,121 @@
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from benchmarks.bench_docx import SAMPLE_RESUME, SAMPLE_COVER_LETTER
+from src.prompts.resume_tailor import SYSTEM_PROMPT
+from src.prompts.cover_letter import COVER_LETTER_SYSTEM_PROMPT
+from src.prompts.combined import COMBINED_SYSTEM_PROMPT
+from src.prompts.resume_extract import EXTRACT_SYSTEM_PROMPT
+from src.prompts.resume_patch import PATCH_SYSTEM_PROMPT
+
+COVER_LETTER = {"name": SAMPLE_RESUME["name"], "content": SAMPLE_COVER_LETTER}
+
+PATCH = {
+    "professional_summary": SAMPLE_RESUME["professional_summary"],
+    "work_experience": [{"index": 0, "bullets": SAMPLE_RESUME["work_experience"][0]["bullets"][::-1]}],
+    "skills": SAMPLE_RESUME["skills"] + ["CI/CD pipelines"],
+}
+
+VISION_TEXT = "\n".join(
+    [SAMPLE_RESUME["name"], SAMPLE_RESUME["email"], "", "EXPERIENCE"]
+    + [bullet for job in SAMPLE_RESUME["work_experience"] for bullet in job["bullets"]]
+)
+
+
+def canned_content(messages: list[dict]) -> str:
+    first = messages[0]
+    if first["role"] == "user" and isinstance(first["content"], list):
+        return VISION_TEXT
+    if first["content"] == COVER_LETTER_SYSTEM_PROMPT:
+        return json.dumps(COVER_LETTER)
+    if first["content"] == COMBINED_SYSTEM_PROMPT:
+        return json.dumps({"resume": SAMPLE_RESUME, "cover_letter": COVER_LETTER})
+    if first["content"] in (SYSTEM_PROMPT, EXTRACT_SYSTEM_PROMPT):
+        return json.dumps(SAMPLE_RESUME)
+    if first["content"] == PATCH_SYSTEM_PROMPT:
+        return json.dumps(PATCH)
+    return "{}"
+
+
+# an OpenAI-compatible chat completions endpoint that answers every prompt
+# with canned output after `latency` (+- `jitter`) seconds
+def create_app(latency: float = 0.5, jitter: float = 0.1, stream_chunk: int = 40) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    def delay() -> float:
+        return max(0.0, latency + random.uniform(-jitter, jitter))
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        content = canned_content(body["messages"])
+        usage = {
+            "prompt_tokens": len(json.dumps(body["messages"])) // 4,
+            "completion_tokens": len(content) // 4,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": body["model"]}
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay())
+            return {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        pieces = [content[i:i + stream_chunk] for i in range(0, len(content), stream_chunk)]
+        step = delay() / max(1, len(pieces))
+
+        async def chunks():
+            for piece in pieces:
+                await asyncio.sleep(step)
+                delta = {"index": 0, "delta": {"content": piece}, "finish_reason": None}
+                yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [delta]})}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @app.get("/calls")
+    def calls():
+        return {"calls": app.state.calls}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# runs an ASGI app with uvicorn on a background thread; returns the server so it can be stopped
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server for benchmarks")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.jitter), host="127.0.0.1", port=args.port)
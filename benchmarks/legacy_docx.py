@@ -0,0 +1,152 @@
+import io
+from docx import Document
+from docx.shared import Pt, Inches, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+
+# the python-docx builders that src/docx_render.py replaced, kept as the
+# baseline for benchmarks
+
+
+def legacy_create_cover_letter_docx(text: str) -> bytes:
+    doc = Document()
+
+    for section in doc.sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
+
+    for paragraph in text.strip().split('\n\n'):
+        if paragraph.strip():
+            p = doc.add_paragraph(paragraph.strip())
+            p.paragraph_format.space_after = Pt(12)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_create_docx(resume_data: dict) -> bytes:
+    doc = Document()
+
+    for section in doc.sections:
+        section.top_margin = Inches(0.5)
+        section.bottom_margin = Inches(0.5)
+        section.left_margin = Inches(0.5)
+        section.right_margin = Inches(0.5)
+
+    def add_section_heading(text):
+        heading = doc.add_paragraph()
+        heading_run = heading.add_run(text.upper())
+        heading_run.bold = True
+        heading_run.font.size = Pt(11)
+        heading_run.font.color.rgb = RGBColor(0, 51, 102)
+        heading.space_before = Pt(10)
+        heading.space_after = Pt(2)
+
+    # header
+    name = doc.add_paragraph()
+    name_run = name.add_run(resume_data['name'])
+    name_run.bold = True
+    name_run.font.size = Pt(20)
+    name_run.font.color.rgb = RGBColor(0, 0, 0)
+    name.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    name.space_after = Pt(4)
+
+    contact_parts = []
+    for field in ['email', 'phone', 'location', 'github', 'linkedin', 'portfolio']:
+        value = resume_data.get(field, '').strip()
+        if value:
+            contact_parts.append(value)
+
+    contact = doc.add_paragraph()
+    contact_run = contact.add_run(' | '.join(contact_parts))
+    contact_run.font.size = Pt(10)
+    contact_run.font.color.rgb = RGBColor(64, 64, 64)
+    contact.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    contact.space_after = Pt(10)
+
+    # professional summary
+    if resume_data.get('professional_summary'):
+        add_section_heading('Professional Summary')
+        summary = doc.add_paragraph(resume_data['professional_summary'])
+        summary.space_after = Pt(8)
+
+    # professional experience
+    add_section_heading('Professional Experience')
+    for job in resume_data.get('work_experience', []):
+        title_para = doc.add_paragraph()
+        title_run = title_para.add_run(job['title'])
+        title_run.bold = True
+        title_run.font.size = Pt(11)
+        title_para.space_after = Pt(2)
+
+        company_para = doc.add_paragraph()
+        company_run = company_para.add_run(f"{job['company']} | ")
+        company_run.font.size = Pt(10)
+        duration_run = company_para.add_run(job['duration'])
+        duration_run.italic = True
+        duration_run.font.size = Pt(10)
+        duration_run.font.color.rgb = RGBColor(64, 64, 64)
+        company_para.space_after = Pt(4)
+
+        for bullet in job['bullets']:
+            bullet_para = doc.add_paragraph(bullet, style='List Bullet')
+            bullet_para.space_after = Pt(2)
+
+        doc.add_paragraph().space_after = Pt(6)
+
+    # key projects
+    if resume_data.get('projects'):
+        add_section_heading('Key Projects')
+        for project in resume_data['projects']:
+            project_para = doc.add_paragraph()
+            name_run = project_para.add_run(project['name'])
+            name_run.bold = True
+            name_run.font.size = Pt(10.5)
+            project_para.space_after = Pt(2)
+
+            for bullet in project['bullets']:
+                bullet_para = doc.add_paragraph(bullet, style='List Bullet')
+                bullet_para.space_after = Pt(2)
+
+            doc.add_paragraph().space_after = Pt(4)
+
+    # technical skills
+    if resume_data.get('skills'):
+        add_section_heading('Technical Skills')
+        skills_text = ' | '.join(resume_data['skills'])
+        skills = doc.add_paragraph(skills_text)
+        skills.space_after = Pt(8)
+
+    # core competencies
+    if resume_data.get('soft_skills'):
+        add_section_heading('Core Competencies')
+        soft_skills_text = ' | '.join(resume_data['soft_skills'])
+        competencies = doc.add_paragraph(soft_skills_text)
+        competencies.space_after = Pt(8)
+
+    # education
+    if resume_data.get('education'):
+        add_section_heading('Education')
+        for edu in resume_data['education']:
+            edu_para = doc.add_paragraph()
+            degree_run = edu_para.add_run(edu['degree'])
+            degree_run.bold = True
+            degree_run.font.size = Pt(10.5)
+            edu_para.add_run(f" - {edu['institution']}, {edu['year']}")
+            edu_para.space_after = Pt(4)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+# the python-docx extraction that src/docx_text.py replaced; it only sees body paragraphs
+def legacy_extract_docx_text(file_bytes: bytes) -> str:
+    doc = Document(io.BytesIO(file_bytes))
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text.strip()
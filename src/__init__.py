@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+
+# modules read their settings when imported, so .env is loaded once, before any of them;
+# variables already set in the environment take precedence
+load_dotenv()
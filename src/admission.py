@@ -0,0 +1,147 @@
+import os
+import math
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from src.compaction import count_tokens
+from src.database import take_rate_limit_tokens
+from src.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# provider limits shared by all worker processes through the database; 0 disables a limit
+LLM_RPM_LIMIT = float(os.getenv("LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = float(os.getenv("LLM_TPM_LIMIT", "0"))
+# model calls in flight per worker process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+# calls allowed to wait for admission per worker process, counting queued jobs, before new requests get 503
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "128"))
+# longest a call waits for admission
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", "60"))
+# completion tokens assumed per call when reserving TPM
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "1500"))
+IMAGE_TOKEN_ESTIMATE = 1000
+
+ADMISSION_WAIT_SECONDS = Histogram("admission_wait_seconds", "Time model calls waited for admission")
+ADMISSION_REJECTED = Counter("admission_rejected", "Model calls rejected by admission control", ("reason",))
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: float, reason: str):
+        super().__init__(f"Model capacity exhausted ({reason}), retry in {math.ceil(retry_after)}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def estimate_tokens(messages: list[dict], completion_tokens: int = LLM_COMPLETION_TOKEN_ESTIMATE) -> int:
+    tokens = completion_tokens
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            tokens += count_tokens(content)
+            continue
+        for part in content:
+            tokens += count_tokens(part["text"]) if part["type"] == "text" else IMAGE_TOKEN_ESTIMATE
+    return tokens
+
+
+class AdmissionController:
+    def __init__(self, rpm: float = LLM_RPM_LIMIT, tpm: float = LLM_TPM_LIMIT,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, max_waiting: int = ADMISSION_QUEUE_SIZE,
+                 timeout: float = ADMISSION_TIMEOUT):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        # when the shared rate limit buckets have capacity again, as last seen by this process
+        self._limited_until = 0.0
+        self._tokens_per_call = float(LLM_COMPLETION_TOKEN_ESTIMATE)
+
+    # calls the full buckets hold, None without limits; they refill over a minute
+    def _burst(self) -> float | None:
+        bursts = []
+        if self.rpm:
+            bursts.append(self.rpm)
+        if self.tpm:
+            bursts.append(self.tpm / self._tokens_per_call)
+        return min(bursts) if bursts else None
+
+    # seconds until the calls waiting here plus `backlog` more (e.g. of queued jobs) are
+    # admitted; a lower bound, as other worker processes draw from the same limits
+    def estimated_wait(self, backlog: int = 0) -> float:
+        burst = self._burst()
+        if burst is None:
+            return 0.0
+        calls = self._waiting + backlog
+        limited = max(0.0, self._limited_until - time.monotonic())
+        # until the buckets were last seen empty, assume they hold a full minute of calls
+        if not limited:
+            calls = max(0.0, calls - burst)
+        return limited + calls * 60 / burst
+
+    # None while `calls` more calls fit behind the `backlog` ones (e.g. of queued jobs), else the
+    # Retry-After hint in seconds; only the first call has to be admitted within the timeout, as
+    # the later ones are paced by their job; a request larger than the whole queue needs it empty
+    def retry_after(self, backlog: int = 0, calls: int = 1) -> float | None:
+        fits = self._waiting + backlog + min(calls, self.max_waiting) <= self.max_waiting
+        if fits and self.estimated_wait(backlog + 1) <= self.timeout:
+            return None
+        return max(1.0, self.estimated_wait(backlog + calls))
+
+    def _costs(self, tokens: int) -> dict:
+        costs = {}
+        if self.rpm:
+            costs["llm:requests"] = (1, self.rpm, self.rpm / 60)
+        if self.tpm:
+            costs["llm:tokens"] = (tokens, self.tpm, self.tpm / 60)
+        return costs
+
+    async def _take_tokens(self, tokens: int, deadline: float) -> None:
+        costs = self._costs(tokens)
+        while costs:
+            wait = await asyncio.to_thread(take_rate_limit_tokens, costs)
+            if not wait:
+                return
+            self._limited_until = time.monotonic() + wait
+            if time.monotonic() + wait > deadline:
+                raise Overloaded(wait, "rate limit")
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int):
+        if self._waiting >= self.max_waiting:
+            ADMISSION_REJECTED.inc(reason="queue_full")
+            raise Overloaded(max(1.0, self.estimated_wait()), "queue full")
+
+        start = time.monotonic()
+        acquired = False
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            acquired = True
+            await self._take_tokens(tokens, start + self.timeout)
+        except asyncio.TimeoutError:
+            ADMISSION_REJECTED.inc(reason="concurrency")
+            raise Overloaded(max(1.0, self.estimated_wait()), "concurrency")
+        except BaseException as e:
+            if acquired:
+                self._semaphore.release()
+            if isinstance(e, Overloaded):
+                ADMISSION_REJECTED.inc(reason="rate_limit")
+            raise
+        finally:
+            self._waiting -= 1
+
+        ADMISSION_WAIT_SECONDS.observe(time.monotonic() - start)
+        self._tokens_per_call += 0.1 * (tokens - self._tokens_per_call)
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+admission = AdmissionController()
@@ -1,11 +1,72 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Body
+import io
+import os
+import re
+import json
+import time
+import base64
+import asyncio
+import logging
+import zipfile
+from datetime import datetime
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Body, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 
-from src.database import create_resume, get_resume, update_resume
-from src.resume_processor import read_resume, call_openai, create_docx, call_openai_cover_letter, create_cover_letter_docx
+from src.admission import admission, Overloaded
+from src.blobstore import get_blob_store
+from src.cache import (
+    get_resume_text, get_resume_data, get_cached_resume_data, cached_llm_call, llm_cache_key,
+    get_cached_llm_result, set_cached_llm_result
+)
+from src.compaction import compact_inputs
+from src.database import (
+    create_resume, get_resume, get_resume_by_hash, get_resume_async, update_resume, delete_resume, list_resumes,
+    get_job, get_job_result, create_job, set_job_status, create_batch, get_batch, update_batch, update_batch_item,
+    has_active_jobs, init_db, ping_db, RESUME_LISTING, ACTIVE_JOB_STATUSES
+)
+from src.downloads import blob_response
+from src.jobs import job_queue, QueueFull, RESUME_STATUS_FIELDS
+from src.llm import close_client, get_providers, retry_after_seconds, is_rate_limit_error
+from src.metrics import stage, render as render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE, HTTP_REQUEST_SECONDS, PAYLOAD_BYTES
+from src.pdf_render import check_image_format
+from src.resume_processor import (
+    call_openai, stream_openai, create_docx, call_openai_cover_letter,
+    call_openai_combined, create_cover_letter_docx, call_openai_patch, stream_openai_patch, TAILOR_GENERATION
+)
+from src.resume_patch import apply_patch, diff_resume_data
+from src.retention import retention_job, release_blobs
+from src.streaming import SectionParser, PatchSectionParser, sse
+from src.uploads import receive_upload, UPLOAD_OPENAPI
+from src.workers import document_pool
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "3"))
+
+OWNER_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
 
-app = FastAPI(title="Resume Tailor API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    await asyncio.to_thread(init_db)
+    await document_pool.start()
+    await job_queue.start()
+    await retention_job.start()
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    await retention_job.stop()
+    await job_queue.stop()
+    await close_client()
+    document_pool.stop()
+
+
+app = FastAPI(title="Resume Tailor API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,114 +77,575 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # label by route template so ids don't explode the series count
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+def overloaded_headers(retry_after: float) -> dict:
+    return {"Retry-After": str(max(1, round(retry_after)))}
+
+
+# fail fast instead of queueing more work while model calls, including those of queued jobs,
+# are backed up; `calls` is how many the request adds
+def check_admission(calls: int = 1) -> None:
+    retry_after = admission.retry_after(job_queue.backlog, calls)
+    if retry_after is not None:
+        raise HTTPException(503, "Model capacity exhausted, try again later", headers=overloaded_headers(retry_after))
+
+
+# 503 until startup has finished and while the database, model provider or page image config is unusable
+@app.get("/ready", include_in_schema=False)
+async def ready(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=503)
+    try:
+        await asyncio.to_thread(ping_db)
+        get_providers()
+        check_image_format()
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return JSONResponse({"status": "unavailable", "detail": str(e)}, status_code=503)
+    return {"status": "ready"}
+
+
+# an unguessable id of the user or browser session, sent as X-Owner-Id; resumes uploaded
+# with one are only visible to requests carrying the same id
+def get_owner_id(x_owner_id: str | None = Header(None)) -> str | None:
+    if x_owner_id is not None and not OWNER_ID_PATTERN.fullmatch(x_owner_id):
+        raise HTTPException(400, "Invalid X-Owner-Id header")
+    return x_owner_id
+
+
+def check_owner(resume: dict | None, owner_id: str | None, detail: str = "Resume not found") -> dict:
+    # another owner's resume looks the same as a missing one
+    if not resume or resume["owner_id"] not in (None, owner_id):
+        raise HTTPException(404, detail)
+    return resume
+
+
+# batches and jobs belong to the owner of their resume
+def check_resume_owner(resume_id: int, owner_id: str | None, detail: str) -> None:
+    check_owner(get_resume(resume_id, ("owner_id",)), owner_id, detail)
+
+
+def encode_cursor(resume: dict) -> str:
+    raw = f"{resume['created_at'].isoformat()}|{resume['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, resume_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(resume_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Resume Tailor API, Go to /docs to get started"}
 
 
-@app.post("/upload")
-async def upload_resume(file: UploadFile = File(...)):
-    if not file.filename.endswith(('.pdf', '.docx')):
-        raise HTTPException(400, "File must be .pdf or .docx")
+@app.post("/upload", openapi_extra=UPLOAD_OPENAPI)
+async def upload_resume(request: Request, owner_id: str | None = Depends(get_owner_id)):
+    upload = await receive_upload(request)
+    PAYLOAD_BYTES.observe(upload.size, kind="upload")
 
-    content = await file.read()
-    resume_id = create_resume(file.filename, content)
+    # stored even for duplicates: put_file skips existing blobs, and this restores one that
+    # retention deleted while a resume started referencing it
+    with upload.file:
+        with stage("blob_put"):
+            await asyncio.to_thread(get_blob_store().put_file, upload.file_hash, upload.file)
 
-    return {"id": resume_id, "filename": file.filename}
+    existing = await asyncio.to_thread(get_resume_by_hash, upload.file_hash, ("id", "original_filename"), owner_id)
+    if existing:
+        return {"id": existing["id"], "filename": existing["original_filename"], "duplicate": True}
+    resume_id = await asyncio.to_thread(create_resume, upload.filename, upload.file_hash, upload.size, owner_id)
 
+    return {"id": resume_id, "filename": upload.filename}
 
-@app.post("/resumes/{resume_id}/tailor")
-def tailor_resume(resume_id: int, job_description: str = Body(..., media_type="text/plain")):
-    resume = get_resume(resume_id)
-    if not resume:
-        raise HTTPException(404, "Resume not found")
 
-    update_resume(resume_id, status="processing", job_description=job_description)
+async def store_output(prefix: str, data: bytes) -> dict:
+    PAYLOAD_BYTES.observe(len(data), kind=prefix)
+    with stage("blob_put"):
+        key = await asyncio.to_thread(get_blob_store().put, data)
+    return {f"{prefix}_hash": key, f"{prefix}_size": len(data)}
 
-    resume_text = read_resume(resume["file_content"], resume["original_filename"])
-    tailored_data = call_openai(resume_text, job_description)
 
-    output_bytes = create_docx(tailored_data)
-    user_name = tailored_data.get("name", "")
+def token_counts(usage: dict) -> dict:
+    return {"tokens_before": usage["tokens_before"], "tokens_after": usage["tokens_after"]}
 
-    update_resume(resume_id, status="completed", output_content=output_bytes, user_name=user_name)
 
-    return {"status": "completed", "user_name": user_name}
+async def prompt_inputs(resume: dict, job_description: str) -> tuple[str, str, dict]:
+    resume_text = await get_resume_text(resume)
+    with stage("compact_inputs"):
+        return compact_inputs(resume_text, job_description)
 
 
-@app.post("/resumes/{resume_id}/cover-letter")
-def generate_cover_letter(resume_id: int, job_description: str = Body(..., media_type="text/plain")):
-    resume = get_resume(resume_id)
-    if not resume:
-        raise HTTPException(404, "Resume not found")
+# the extracted resume, and the compacted resume JSON and job description the patch prompt gets
+async def patch_inputs(resume: dict, resume_text: str, job_description: str) -> tuple[dict, str, str, dict]:
+    resume_data = await get_resume_data(resume, resume_text)
+    resume_json = json.dumps(resume_data, ensure_ascii=False, separators=(",", ":"))
+    with stage("compact_inputs"):
+        resume_json, job_description, usage = compact_inputs(resume_json, job_description, structured_resume=True)
+    return resume_data, resume_json, job_description, usage
 
-    resume_text = read_resume(resume["file_content"], resume["original_filename"])
-    cover_letter_data = call_openai_cover_letter(resume_text, job_description)
 
-    output_bytes = create_cover_letter_docx(cover_letter_data["content"])
+async def tailor(resume: dict, resume_text: str, job_description: str, regenerate: bool = False) -> tuple[dict, dict]:
+    if TAILOR_GENERATION == "single":
+        with stage("compact_inputs"):
+            resume_text, job_description, usage = compact_inputs(resume_text, job_description)
+        return await cached_llm_call("tailor", call_openai, resume_text, job_description, regenerate), usage
+
+    resume_data, resume_json, job_description, usage = await patch_inputs(resume, resume_text, job_description)
+    patch = await cached_llm_call("tailor_patch", call_openai_patch, resume_json, job_description, regenerate)
+    return apply_patch(resume_data, patch), usage
+
+
+async def run_tailor(resume_id: int, job_description: str, regenerate: bool = False) -> dict:
+    resume = await get_resume_async(resume_id)
+    resume_text = await get_resume_text(resume)
+    tailored_data, usage = await tailor(resume, resume_text, job_description, regenerate)
+
+    output_bytes = await create_docx(tailored_data)
+    user_name = tailored_data.get("name", "")
+
+    await asyncio.to_thread(update_resume, resume_id, user_name=user_name, **await store_output("output", output_bytes))
+    return {**token_counts(usage), "result": json.dumps(tailored_data)}
+
+
+async def run_cover_letter(resume_id: int, job_description: str, regenerate: bool = False) -> dict:
+    resume = await get_resume_async(resume_id)
+    resume_text, job_description, usage = await prompt_inputs(resume, job_description)
+    cover_letter_data = await cached_llm_call(
+        "cover_letter", call_openai_cover_letter, resume_text, job_description, regenerate
+    )
+
+    output_bytes = await create_cover_letter_docx(cover_letter_data["content"])
     user_name = cover_letter_data.get("name", "")
 
-    update_resume(resume_id, cover_letter_content=output_bytes, user_name=user_name)
+    await asyncio.to_thread(update_resume, resume_id, user_name=user_name, **await store_output("cover_letter", output_bytes))
+    return token_counts(usage)
 
-    return {"status": "completed", "user_name": user_name}
 
+async def run_generate(resume_id: int, job_description: str, regenerate: bool = False) -> dict:
+    resume = await get_resume_async(resume_id)
+    resume_text, job_description, usage = await prompt_inputs(resume, job_description)
+    tailored_data, cover_letter_data = await cached_llm_call(
+        "combined", call_openai_combined, resume_text, job_description, regenerate
+    )
 
-@app.get("/resumes/{resume_id}")
-def get_resume_status(resume_id: int):
-    resume = get_resume(resume_id)
-    if not resume:
-        raise HTTPException(404, "Resume not found")
+    output_bytes, cover_letter_bytes = await asyncio.gather(
+        create_docx(tailored_data),
+        create_cover_letter_docx(cover_letter_data["content"])
+    )
+    user_name = tailored_data.get("name") or cover_letter_data.get("name", "")
+
+    await asyncio.to_thread(
+        update_resume,
+        resume_id,
+        user_name=user_name,
+        **await store_output("output", output_bytes),
+        **await store_output("cover_letter", cover_letter_bytes)
+    )
+    return {**token_counts(usage), "result": json.dumps(tailored_data)}
+
+
+def build_batch_zip(items: list[dict]) -> bytes:
+    store = get_blob_store()
+    buffer = io.BytesIO()
+    # DOCX files are already deflated, so store them as-is
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for item in items:
+            if item["status"] == "completed":
+                safe_name = (item["user_name"] or "unknown").replace(" ", "_")
+                archive.writestr(f"{item['position'] + 1:02d}_{safe_name}_resume.docx", store.get(item["output_hash"]))
+    return buffer.getvalue()
+
+
+async def run_batch(batch_id: str, regenerate: bool = False) -> None:
+    batch = await asyncio.to_thread(get_batch, batch_id)
+    if not batch:
+        logger.warning(f"Batch {batch_id} was deleted before it ran")
+        return
+    await asyncio.to_thread(update_batch, batch_id, status="processing")
+
+    resume = await get_resume_async(batch["resume_id"])
+    resume_text = await get_resume_text(resume)
+    if TAILOR_GENERATION != "single":
+        # extract once up front instead of once per concurrent item
+        await get_resume_data(resume, resume_text)
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    # when the provider rate limits one item, every item waits until this time
+    paused_until = 0.0
+
+    async def tailor_item(item: dict) -> None:
+        nonlocal paused_until
+        async with semaphore:
+            await asyncio.to_thread(update_batch_item, item["id"], status="processing")
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                delay = paused_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    tailored_data, _ = await tailor(resume, resume_text, item["job_description"], regenerate)
+                    break
+                except Exception as e:
+                    if not (isinstance(e, Overloaded) or is_rate_limit_error(e)) or attempt == BATCH_MAX_RETRIES:
+                        raise
+                    paused_until = max(paused_until, time.monotonic() + retry_after_seconds(e, 2 ** attempt))
+
+        output_bytes = await create_docx(tailored_data)
+        output = await store_output("output", output_bytes)
+        # the batch was deleted meanwhile, so nothing refers to the file
+        if not await asyncio.to_thread(
+            update_batch_item, item["id"], status="completed", user_name=tailored_data.get("name", ""), **output
+        ):
+            await asyncio.to_thread(release_blobs, {output["output_hash"]})
+
+    async def run_item(item: dict) -> None:
+        try:
+            await tailor_item(item)
+        except Exception as e:
+            logger.exception(f"Batch {batch_id} item {item['position']} failed")
+            await asyncio.to_thread(update_batch_item, item["id"], status="failed", error=str(e))
+
+    await asyncio.gather(*(run_item(item) for item in batch["items"]))
+
+    batch = await asyncio.to_thread(get_batch, batch_id)
+    if not batch:
+        logger.warning(f"Batch {batch_id} was deleted while it ran")
+        return
+    items = batch["items"]
+    completed = sum(1 for item in items if item["status"] == "completed")
+    if not completed:
+        await asyncio.to_thread(update_batch, batch_id, status="failed")
+        raise RuntimeError("All batch items failed")
+
+    zip_bytes = await asyncio.to_thread(build_batch_zip, items)
+    output = await store_output("zip", zip_bytes)
+    status = "completed" if completed == len(items) else "partial"
+    if not await asyncio.to_thread(update_batch, batch_id, status=status, **output):
+        await asyncio.to_thread(release_blobs, {output["zip_hash"]})
+
+
+async def submit_job(resume_id: int, kind: str, fn, *args, calls: int = 1) -> str:
+    try:
+        return await job_queue.submit(resume_id, kind, fn, *args, calls=calls)
+    except QueueFull:
+        retry_after = max(admission.estimated_wait(job_queue.backlog), job_queue.estimated_wait())
+        raise HTTPException(503, "Job queue is full, try again later", headers=overloaded_headers(retry_after))
+
+
+async def enqueue(resume_id: int, kind: str, fn, *args) -> JSONResponse:
+    job_id = await submit_job(resume_id, kind, fn, *args)
+    return JSONResponse({"job_id": job_id, "status": "queued"}, status_code=202)
+
+
+@app.post("/resumes/{resume_id}/tailor", status_code=202)
+async def tailor_resume(
+    resume_id: int,
+    job_description: str = Body(..., media_type="text/plain"),
+    regenerate: bool = False,
+    owner_id: str | None = Depends(get_owner_id)
+):
+    check_admission()
+    check_owner(await get_resume_async(resume_id, ("owner_id",)), owner_id)
+
+    await asyncio.to_thread(update_resume, resume_id, job_description=job_description)
+    return await enqueue(resume_id, "tailor", run_tailor, resume_id, job_description, regenerate)
+
+
+@app.post("/resumes/{resume_id}/tailor/stream")
+async def tailor_resume_stream(
+    resume_id: int,
+    job_description: str = Body(..., media_type="text/plain"),
+    regenerate: bool = False,
+    owner_id: str | None = Depends(get_owner_id)
+):
+    check_admission()
+    resume = check_owner(await get_resume_async(resume_id), owner_id)
+
+    await asyncio.to_thread(update_resume, resume_id, job_description=job_description)
+    resume_fields = RESUME_STATUS_FIELDS["tailor"]
+
+    async def events():
+        # a job row, heartbeated like queued jobs, so the resume is failed by the
+        # stale job sweep if this process dies mid-stream
+        job_id = await asyncio.to_thread(create_job, resume_id, "tailor", resume_fields, status="processing")
+        job_queue.track(job_id)
+        completed = False
+        error = "Client disconnected"
+        try:
+            yield sse("job", {"job_id": job_id})
+            if TAILOR_GENERATION == "single":
+                resume_text, prompt_job_description, usage = await prompt_inputs(resume, job_description)
+                yield sse("usage", usage)
+                parser = SectionParser()
+                cache_key = llm_cache_key("tailor", resume_text, prompt_job_description)
+                cached = None if regenerate else await get_cached_llm_result(cache_key)
+
+                if cached is not None:
+                    for event, data in parser.feed(json.dumps(cached)):
+                        yield sse(event, data)
+                else:
+                    async for chunk in stream_openai(resume_text, prompt_job_description):
+                        for event, data in parser.feed(chunk):
+                            yield sse(event, data)
+
+                tailored_data = parser.result()
+                if cached is None:
+                    await set_cached_llm_result(cache_key, "tailor", tailored_data)
+            else:
+                # same extraction and patch as the tailor job, with the patch streamed
+                resume_text = await get_resume_text(resume)
+                resume_data, resume_json, prompt_job_description, usage = await patch_inputs(resume, resume_text, job_description)
+                yield sse("usage", usage)
+                parser = PatchSectionParser(resume_data)
+                cache_key = llm_cache_key("tailor_patch", resume_json, prompt_job_description)
+                cached = None if regenerate else await get_cached_llm_result(cache_key)
+
+                if cached is not None:
+                    for event, data in parser.feed(json.dumps(cached)):
+                        yield sse(event, data)
+                else:
+                    async for chunk in stream_openai_patch(resume_json, prompt_job_description):
+                        for event, data in parser.feed(chunk):
+                            yield sse(event, data)
+                for event, data in parser.rest():
+                    yield sse(event, data)
+
+                tailored_data = parser.result()
+                if cached is None:
+                    await set_cached_llm_result(cache_key, "tailor_patch", parser.patch())
+
+            output_bytes = await create_docx(tailored_data)
+            user_name = tailored_data.get("name", "")
+            await asyncio.to_thread(update_resume, resume_id, user_name=user_name, **await store_output("output", output_bytes))
+            await asyncio.to_thread(
+                set_job_status, job_id, "completed", resume_fields, **token_counts(usage), result=json.dumps(tailored_data)
+            )
+            completed = True
+            yield sse("done", {"status": "completed", "user_name": user_name})
+        except Exception as e:
+            logger.exception(f"Streaming tailor failed for resume {resume_id}")
+            error = str(e)
+            yield sse("error", {"status": "failed", "detail": error})
+        finally:
+            job_queue.untrack(job_id)
+            # also reached when the client disconnects and the generator is cancelled
+            if not completed:
+                # shielded: a cancelled stream is cancelled again at every await
+                await asyncio.shield(asyncio.to_thread(set_job_status, job_id, "failed", resume_fields, error=error))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/resumes/{resume_id}/cover-letter", status_code=202)
+async def generate_cover_letter(
+    resume_id: int,
+    job_description: str = Body(..., media_type="text/plain"),
+    regenerate: bool = False,
+    owner_id: str | None = Depends(get_owner_id)
+):
+    check_admission()
+    check_owner(await get_resume_async(resume_id, ("owner_id",)), owner_id)
+
+    return await enqueue(resume_id, "cover_letter", run_cover_letter, resume_id, job_description, regenerate)
+
+
+@app.post("/resumes/{resume_id}/generate", status_code=202)
+async def generate_resume_and_cover_letter(
+    resume_id: int,
+    job_description: str = Body(..., media_type="text/plain"),
+    regenerate: bool = False,
+    owner_id: str | None = Depends(get_owner_id)
+):
+    check_admission()
+    check_owner(await get_resume_async(resume_id, ("owner_id",)), owner_id)
+
+    await asyncio.to_thread(update_resume, resume_id, job_description=job_description)
+    return await enqueue(resume_id, "generate", run_generate, resume_id, job_description, regenerate)
+
+
+@app.post("/resumes/{resume_id}/tailor/batch", status_code=202)
+async def tailor_resume_batch(
+    resume_id: int,
+    job_descriptions: list[str] = Body(...),
+    regenerate: bool = False,
+    owner_id: str | None = Depends(get_owner_id)
+):
+    check_owner(await get_resume_async(resume_id, ("owner_id",)), owner_id)
+
+    job_descriptions = [jd for jd in job_descriptions if jd.strip()]
+    if not job_descriptions:
+        raise HTTPException(400, "At least one job description is required")
+    if len(job_descriptions) > BATCH_MAX_ITEMS:
+        raise HTTPException(400, f"At most {BATCH_MAX_ITEMS} job descriptions per batch")
+    # one model call per item
+    check_admission(len(job_descriptions))
+
+    batch_id = await asyncio.to_thread(create_batch, resume_id, job_descriptions)
+    job_id = await submit_job(resume_id, "batch", run_batch, batch_id, regenerate, calls=len(job_descriptions))
+
+    return JSONResponse({"batch_id": batch_id, "job_id": job_id, "status": "queued"}, status_code=202)
+
+
+@app.get("/batches/{batch_id}")
+def get_batch_status(batch_id: str, owner_id: str | None = Depends(get_owner_id)):
+    batch = get_batch(batch_id)
+    if not batch:
+        raise HTTPException(404, "Batch not found")
+    check_resume_owner(batch["resume_id"], owner_id, "Batch not found")
 
     return {
-        "id": resume["id"],
-        "original_filename": resume["original_filename"],
-        "user_name": resume["user_name"],
-        "created_at": resume["created_at"],
-        "status": resume["status"],
-        "has_output": resume["output_content"] is not None,
-        "has_cover_letter": resume["cover_letter_content"] is not None
+        "id": batch["id"],
+        "resume_id": batch["resume_id"],
+        "status": batch["status"],
+        "created_at": batch["created_at"],
+        "has_download": batch["zip_hash"] is not None,
+        "items": [
+            {key: item[key] for key in ("position", "status", "error", "user_name")}
+            for item in batch["items"]
+        ]
     }
 
 
+@app.get("/batches/{batch_id}/download")
+def download_batch(batch_id: str, request: Request, owner_id: str | None = Depends(get_owner_id)):
+    batch = get_batch(batch_id)
+    if not batch:
+        raise HTTPException(404, "Batch not found")
+    check_resume_owner(batch["resume_id"], owner_id, "Batch not found")
+
+    if not batch["zip_hash"]:
+        raise HTTPException(400, "Batch not ready for download")
+
+    return blob_response(request, batch["zip_hash"], batch["zip_size"], f"batch_{batch_id}.zip", media_type="application/zip")
+
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str, owner_id: str | None = Depends(get_owner_id)):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    check_resume_owner(job["resume_id"], owner_id, "Job not found")
+
+    return job
+
+
+# field-level changes of a tailored resume against another tailoring job,
+# or against the resume as extracted when no other job is given
+@app.get("/jobs/{job_id}/diff")
+def get_job_diff(job_id: str, against: str | None = None, owner_id: str | None = Depends(get_owner_id)):
+    job = get_job_result(job_id)
+    if not job or job["result"] is None:
+        raise HTTPException(404, "No tailored resume for this job")
+    check_resume_owner(job["resume_id"], owner_id, "No tailored resume for this job")
+
+    if against:
+        other = get_job_result(against)
+        if not other or other["result"] is None:
+            raise HTTPException(404, "No tailored resume for the job to compare against")
+        check_resume_owner(other["resume_id"], owner_id, "No tailored resume for the job to compare against")
+        before = json.loads(other["result"])
+    else:
+        resume = get_resume(job["resume_id"], ("file_hash",))
+        before = resume and get_cached_resume_data(resume["file_hash"])
+        if not before:
+            raise HTTPException(404, "Resume has no structured extraction to compare against")
+
+    return {"job_id": job_id, "against": against, "changes": diff_resume_data(before, json.loads(job["result"]))}
+
+
+# the caller's resumes, newest first; pass next_cursor back as cursor for the next page
+@app.get("/resumes")
+def list_owner_resumes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    status: str | None = None,
+    owner_id: str | None = Depends(get_owner_id)
+):
+    if not owner_id:
+        raise HTTPException(400, "X-Owner-Id header is required")
+
+    # one extra row tells whether there is another page
+    resumes = list_resumes(owner_id, limit + 1, decode_cursor(cursor) if cursor else None, status)
+    next_cursor = encode_cursor(resumes[limit - 1]) if len(resumes) > limit else None
+    return {"items": resumes[:limit], "next_cursor": next_cursor}
+
+
+@app.get("/resumes/{resume_id}")
+async def get_resume_status(resume_id: int, owner_id: str | None = Depends(get_owner_id)):
+    resume = check_owner(await get_resume_async(resume_id, (*RESUME_LISTING, "owner_id")), owner_id)
+    del resume["owner_id"]
+    return resume
+
+
+# deletes the resume with its jobs, batches and generated files
+@app.delete("/resumes/{resume_id}", status_code=204)
+async def delete_resume_and_files(resume_id: int, owner_id: str | None = Depends(get_owner_id)):
+    resume = check_owner(await get_resume_async(resume_id, ("owner_id", "status", "cover_letter_status")), owner_id)
+    busy = {resume["status"], resume["cover_letter_status"]} & set(ACTIVE_JOB_STATUSES)
+    # batch jobs leave the resume status alone, so their job rows are checked too
+    if busy or await asyncio.to_thread(has_active_jobs, resume_id):
+        raise HTTPException(409, "Resume has work in progress")
+
+    keys = await asyncio.to_thread(delete_resume, resume_id)
+    if keys:
+        await asyncio.to_thread(release_blobs, keys)
+    return Response(status_code=204)
+
+
 @app.get("/resumes/{resume_id}/download")
-def download_resume(resume_id: int):
-    resume = get_resume(resume_id)
-    if not resume:
-        raise HTTPException(404, "Resume not found")
+def download_resume(resume_id: int, request: Request, owner_id: str | None = Depends(get_owner_id)):
+    resume = check_owner(get_resume(resume_id, ("owner_id", "status", "user_name", "output_hash", "output_size")), owner_id)
 
     if resume["status"] != "completed":
         raise HTTPException(400, "Resume not ready for download")
 
-    if not resume["output_content"]:
+    if not resume["output_hash"]:
         raise HTTPException(404, "Output file not found")
 
     safe_name = (resume["user_name"] or "unknown").replace(" ", "_")
     filename = f"{safe_name}_resume_{resume_id}.docx"
 
-    return Response(
-        content=resume["output_content"],
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    return blob_response(request, resume["output_hash"], resume["output_size"], filename)
 
 
 @app.get("/resumes/{resume_id}/cover-letter/download")
-def download_cover_letter(resume_id: int):
-    resume = get_resume(resume_id)
-    if not resume:
-        raise HTTPException(404, "Resume not found")
+def download_cover_letter(resume_id: int, request: Request, owner_id: str | None = Depends(get_owner_id)):
+    resume = check_owner(get_resume(resume_id, ("owner_id", "user_name", "cover_letter_hash", "cover_letter_size")), owner_id)
 
-    if not resume["cover_letter_content"]:
+    if not resume["cover_letter_hash"]:
         raise HTTPException(404, "Cover letter not found")
 
     safe_name = (resume["user_name"] or "unknown").replace(" ", "_")
     filename = f"{safe_name}_cover_letter_{resume_id}.docx"
 
-    return Response(
-        content=resume["cover_letter_content"],
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    return blob_response(request, resume["cover_letter_hash"], resume["cover_letter_size"], filename)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+import os
+import shutil
+import hashlib
+import tempfile
+from typing import Iterator
+
+BLOB_STORE = os.getenv("BLOB_STORE", "local")
+BLOB_DIR = os.getenv("BLOB_DIR", "data/blobs")
+BLOB_CHUNK_SIZE = int(os.getenv("BLOB_CHUNK_SIZE", str(64 * 1024)))
+
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_PREFIX = os.getenv("S3_PREFIX", "blobs/")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+# blobs are immutable and keyed by the SHA-256 hex digest of their content,
+# so storing the same bytes twice is a no-op
+class BlobStore:
+    def put(self, data: bytes) -> str:
+        raise NotImplementedError
+
+    # stores a file object whose SHA-256 the caller already computed while receiving it
+    def put_file(self, key: str, file) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        return b"".join(self.open(key))
+
+    def open(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str = BLOB_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        self._write(key, lambda f: f.write(data))
+        return key
+
+    def put_file(self, key: str, file) -> None:
+        self._write(key, lambda f: shutil.copyfileobj(file, f, BLOB_CHUNK_SIZE))
+
+    def _write(self, key: str, write) -> None:
+        path = self.path(key)
+        if os.path.exists(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def open(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        try:
+            f = open(self.path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+        return self._read(f, start, end)
+
+    def _read(self, f, start: int, end: int | None) -> Iterator[bytes]:
+        with f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(BLOB_CHUNK_SIZE if remaining is None else min(BLOB_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+# works with boto3's S3 client or anything exposing the same put_object,
+# get_object, head_object and delete_object calls (MinIO, a local stand-in)
+class S3BlobStore(BlobStore):
+    def __init__(self, bucket: str = S3_BUCKET, prefix: str = S3_PREFIX, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        if not self.exists(key):
+            self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+        return key
+
+    def put_file(self, key: str, file) -> None:
+        if not self.exists(key):
+            self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=file)
+
+    def open(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        kwargs = {}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key), **kwargs)
+        except Exception as e:
+            if _is_not_found(e):
+                raise BlobNotFound(key)
+            raise
+        return self._read(response["Body"])
+
+    def _read(self, body) -> Iterator[bytes]:
+        try:
+            while chunk := body.read(BLOB_CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+def _is_not_found(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return isinstance(error, (KeyError, FileNotFoundError)) or code in ("404", "NoSuchKey", "NotFound")
+
+
+_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        if BLOB_STORE == "local":
+            _store = LocalBlobStore()
+        elif BLOB_STORE == "s3":
+            _store = S3BlobStore()
+        else:
+            raise ValueError("BLOB_STORE must be 'local' or 's3'")
+    return _store
@@ -0,0 +1,167 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.blobstore import get_blob_store
+from src.compaction import compact_inputs, COMPACTION_VERSION
+from src.metrics import CACHE_REQUESTS
+from src.database import (
+    get_extracted_text, save_extracted_text, get_structured_resume, save_structured_resume,
+    get_llm_result, save_llm_result
+)
+from src.llm import get_providers
+from src.resume_processor import read_resume, call_openai_extract, EXTRACTOR_VERSION, PROMPTS
+
+TEXT_CACHE_SIZE = int(os.getenv("TEXT_CACHE_SIZE", "256"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "10000"))
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            expires_at, value = self._data[key]
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_text_cache = LRUCache(TEXT_CACHE_SIZE)
+
+
+async def get_resume_text(resume: dict) -> str:
+    file_hash = resume["file_hash"]
+
+    text = _text_cache.get(file_hash)
+    if text is not None:
+        CACHE_REQUESTS.inc(cache="text", result="memory")
+        return text
+
+    text = await asyncio.to_thread(get_extracted_text, file_hash, EXTRACTOR_VERSION)
+    CACHE_REQUESTS.inc(cache="text", result="database" if text is not None else "miss")
+    if text is None:
+        file_content = await asyncio.to_thread(get_blob_store().get, file_hash)
+        text = await read_resume(file_content, resume["original_filename"])
+        await asyncio.to_thread(save_extracted_text, file_hash, EXTRACTOR_VERSION, text)
+
+    _text_cache.set(file_hash, text)
+    return text
+
+
+_llm_cache = LRUCache(LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+
+PROMPT_VERSIONS = {
+    kind: hashlib.sha256("\0".join(prompts).encode()).hexdigest()[:16]
+    for kind, prompts in PROMPTS.items()
+}
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def llm_cache_key(kind: str, resume_text: str, job_description: str) -> str:
+    # results from failover providers are cached under the primary model
+    parts = [kind, get_providers()[0].model, PROMPT_VERSIONS[kind], normalize_text(resume_text), normalize_text(job_description)]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+_structured_cache = LRUCache(TEXT_CACHE_SIZE)
+
+
+def parser_version() -> str:
+    return f"{EXTRACTOR_VERSION}:{COMPACTION_VERSION}:{PROMPT_VERSIONS['extract']}:{get_providers()[0].model}"
+
+
+def get_cached_resume_data(file_hash: str) -> dict | None:
+    key = (file_hash, parser_version())
+    data = _structured_cache.get(key)
+    if data is not None:
+        CACHE_REQUESTS.inc(cache="structured", result="memory")
+        return data
+
+    payload = get_structured_resume(file_hash, key[1])
+    CACHE_REQUESTS.inc(cache="structured", result="database" if payload is not None else "miss")
+    if payload is None:
+        return None
+
+    data = json.loads(payload)
+    _structured_cache.set(key, data)
+    return data
+
+
+# structured extraction of the upload, done once per file and parser version
+async def get_resume_data(resume: dict, resume_text: str) -> dict:
+    file_hash = resume["file_hash"]
+    data = await asyncio.to_thread(get_cached_resume_data, file_hash)
+    if data is not None:
+        return data
+
+    resume_text, _, _ = compact_inputs(resume_text, "")
+    data = await call_openai_extract(resume_text)
+    version = parser_version()
+    await asyncio.to_thread(save_structured_resume, file_hash, version, json.dumps(data))
+    _structured_cache.set((file_hash, version), data)
+    return data
+
+
+async def get_cached_llm_result(key: str):
+    result = _llm_cache.get(key)
+    if result is not None:
+        CACHE_REQUESTS.inc(cache="llm", result="memory")
+        return result
+
+    payload = await asyncio.to_thread(get_llm_result, key, LLM_CACHE_TTL)
+    CACHE_REQUESTS.inc(cache="llm", result="database" if payload is not None else "miss")
+    if payload is None:
+        return None
+
+    result = json.loads(payload)
+    _llm_cache.set(key, result)
+    return result
+
+
+async def set_cached_llm_result(key: str, kind: str, result) -> None:
+    _llm_cache.set(key, result)
+    await asyncio.to_thread(save_llm_result, key, kind, json.dumps(result), LLM_CACHE_MAX_ROWS)
+
+
+async def cached_llm_call(kind: str, fn, resume_text: str, job_description: str, regenerate: bool = False):
+    key = llm_cache_key(kind, resume_text, job_description)
+    if not regenerate:
+        result = await get_cached_llm_result(key)
+        if result is not None:
+            return result
+
+    result = await fn(resume_text, job_description)
+    await set_cached_llm_result(key, kind, result)
+    return result
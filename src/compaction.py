@@ -0,0 +1,184 @@
+import os
+import re
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# combined token budget for resume text + job description in one prompt
+LLM_INPUT_TOKEN_BUDGET = int(os.getenv("LLM_INPUT_TOKEN_BUDGET", "12000"))
+# share of the budget the job description keeps when both inputs are too long
+JD_MIN_BUDGET_SHARE = float(os.getenv("JD_MIN_BUDGET_SHARE", "0.3"))
+
+TRUNCATION_MARKER = "[...truncated]"
+# part of the structured resume cache key; bump when compaction changes what reaches the model
+COMPACTION_VERSION = "3"
+
+# job description sections that never help tailoring
+BOILERPLATE_HEADING = re.compile(
+    r"^(benefits|perks|perks (and|&) benefits|what we offer|why (join|work (at|for|with)) us"
+    r"|compensation( (and|&) benefits)?|salary( range)?|pay (range|transparency)"
+    r"|equal (employment )?opportunity|eeo( statement)?|diversity(,)? (equity )?(and|&) inclusion"
+    r"|accommodations?|reasonable accommodations?|privacy( notice| policy)?|applicant privacy"
+    r"|e-verify|how to apply|disclaimer|legal notice)\b",
+    re.IGNORECASE
+)
+
+SECTION_HEADING = re.compile(
+    r"^(about|responsibilities|requirements|qualifications|what you('| wi)ll do|who you are"
+    r"|skills|experience|the role|your role|role|duties|nice to have|preferred|bonus points"
+    r"|tech stack|our stack|location|job description|overview|summary|team)\b",
+    re.IGNORECASE
+)
+
+# standalone boilerplate paragraphs that show up without a heading
+BOILERPLATE_PARAGRAPH = re.compile(
+    r"equal opportunity employer|without regard to (race|sex|age)|protected veteran status"
+    r"|e-verify|reasonable accommodation|applicant privacy notice",
+    re.IGNORECASE
+)
+
+BULLET = re.compile(r"^[-*•·▪●◦]\s*")
+HORIZONTAL_SPACE = re.compile(r"[ \t\f\v ]+")
+MIN_DEDUPE_LINE = 30
+# boilerplate detection is heuristic; a job description losing more than this falls back to the original
+MIN_JD_KEPT_SHARE = 0.25
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        # ~4 characters per token for English prose
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def normalize_whitespace(text: str) -> str:
+    lines = [HORIZONTAL_SPACE.sub(" ", line).strip() for line in text.replace("\r\n", "\n").split("\n")]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+# consecutive_only keeps repeats further apart, e.g. the same bullet under two roles of a resume
+def dedupe_lines(text: str, consecutive_only: bool = False) -> str:
+    seen = set()
+    kept = []
+    previous = None
+    for line in text.split("\n"):
+        key = line.lower()
+        repeated = not consecutive_only and len(line) >= MIN_DEDUPE_LINE and key in seen
+        if line and (key == previous or repeated):
+            continue
+        seen.add(key)
+        previous = key
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _heading_title(line: str) -> str:
+    return line.rstrip(":").strip()
+
+
+def _is_heading(line: str) -> bool:
+    if not line or len(line) > 60 or BULLET.match(line) or line.endswith("."):
+        return False
+    title = _heading_title(line)
+    return line.endswith(":") or title.isupper() or bool(SECTION_HEADING.match(title)) or bool(BOILERPLATE_HEADING.fullmatch(title))
+
+
+# a boilerplate label with its value on the same line, e.g. "Salary: $150k"
+def _is_boilerplate_field(line: str) -> bool:
+    label, colon, value = line.partition(":")
+    return bool(colon and value.strip() and BOILERPLATE_HEADING.fullmatch(label.strip()))
+
+
+def strip_boilerplate(job_description: str) -> str:
+    kept = []
+    skipping = False
+    for line in job_description.split("\n"):
+        # only a line that is nothing but a boilerplate heading starts a skipped section
+        if _is_heading(line):
+            skipping = bool(BOILERPLATE_HEADING.fullmatch(_heading_title(line)))
+            if skipping:
+                continue
+        if skipping:
+            continue
+        if _is_boilerplate_field(line) or BOILERPLATE_PARAGRAPH.search(line):
+            continue
+        kept.append(line)
+    return "\n".join(kept)
+
+
+# the start of a line cut to at most `max_tokens`, ending on a word boundary when there is one
+def _cut_line(line: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is None:
+        cut = line[:max_tokens * 4]
+    else:
+        # a token can end inside a multi-byte character, which decodes to U+FFFD
+        cut = encoding.decode(encoding.encode(line, disallowed_special=())[:max_tokens]).rstrip("\ufffd")
+    head = cut.rpartition(" ")[0]
+    return head or cut
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    # keep whole lines from the top; the most relevant content leads in both inputs
+    budget = max_tokens - count_tokens(TRUNCATION_MARKER) - 1
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            # a long first line (e.g. a job description pasted as one line) is cut instead of dropped
+            if not kept and budget > 1:
+                kept.append(_cut_line(line, budget - 1))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept + [TRUNCATION_MARKER])
+
+
+# a structured (JSON) resume is sent as it is; only the job description is cut to fit
+def compact_inputs(resume_text: str, job_description: str, budget: int = LLM_INPUT_TOKEN_BUDGET,
+                   structured_resume: bool = False) -> tuple[str, str, dict]:
+    tokens_before = count_tokens(resume_text) + count_tokens(job_description)
+
+    if not structured_resume:
+        resume_text = dedupe_lines(normalize_whitespace(resume_text), consecutive_only=True)
+    original_job_description = normalize_whitespace(job_description)
+    job_description = normalize_whitespace(dedupe_lines(strip_boilerplate(original_job_description)))
+    if len(job_description) < len(original_job_description) * MIN_JD_KEPT_SHARE:
+        job_description = original_job_description
+
+    resume_tokens = count_tokens(resume_text)
+    jd_tokens = count_tokens(job_description)
+    truncated = resume_tokens + jd_tokens > budget
+    if truncated:
+        jd_limit = max(budget - resume_tokens, int(budget * JD_MIN_BUDGET_SHARE))
+        job_description = truncate_to_tokens(job_description, jd_limit)
+        jd_tokens = count_tokens(job_description)
+        if not structured_resume:
+            resume_text = truncate_to_tokens(resume_text, budget - jd_tokens)
+            resume_tokens = count_tokens(resume_text)
+
+    stats = {
+        "tokens_before": tokens_before,
+        "tokens_after": resume_tokens + jd_tokens,
+        "resume_tokens": resume_tokens,
+        "job_description_tokens": jd_tokens,
+        "truncated": truncated,
+    }
+    logger.info(f"Compacted prompt inputs: {stats}")
+    return resume_text, job_description, stats
@@ -1,19 +1,79 @@
 import os
+import time
+import uuid
+import asyncio
 import logging
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, LargeBinary
-from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
-from contextlib import contextmanager
-from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, inspect, select, text, and_, or_, Column, Index, Integer, Float, String, Text, DateTime
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.pool import StaticPool
+from datetime import datetime, timedelta
+from contextlib import contextmanager, asynccontextmanager
 
-load_dotenv()
+from src.metrics import timed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///:memory:")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///data/resume.db")
+# e.g. postgresql+asyncpg://... or sqlite+aiosqlite:///...; enables the async engine
+DATABASE_ASYNC_URL = os.getenv("DATABASE_ASYNC_URL")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def build_engine(url: str):
+    url_obj = make_url(url)
+    if url_obj.get_backend_name() != "sqlite":
+        return create_engine(url, **_pool_options())
+
+    if url_obj.database in (None, "", ":memory:"):
+        # one shared connection, otherwise every thread sees its own empty database
+        return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    sqlite_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    )
+    event.listen(sqlite_engine, "connect", _set_sqlite_pragmas)
+    return sqlite_engine
+
+
+def build_async_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if make_url(url).get_backend_name() == "sqlite":
+        async_engine = create_async_engine(url, connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000})
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return async_engine
+    return create_async_engine(url, **_pool_options())
+
+
+engine = build_engine(DATABASE_URL)
 
 Base = declarative_base()
 
@@ -22,22 +82,177 @@ class Resume(Base):
     __tablename__ = 'resume'
     id = Column(Integer, primary_key=True)
     original_filename = Column(String)
-    file_content = Column(LargeBinary)
+    file_hash = Column(String(64), index=True)
+    file_size = Column(Integer)
+    # user or browser session that uploaded it; None for uploads without an owner
+    owner_id = Column(String(64))
     user_name = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String)
     job_description = Column(String)
-    output_content = Column(LargeBinary)
-    cover_letter_content = Column(LargeBinary)
+    output_hash = Column(String(64), index=True)
+    output_size = Column(Integer)
+    cover_letter_status = Column(String)
+    cover_letter_hash = Column(String(64), index=True)
+    cover_letter_size = Column(Integer)
+
+    __table_args__ = (
+        # listing (owner_id = ? ORDER BY created_at DESC) and retention (created_at < ?)
+        Index("ix_resume_owner_created", "owner_id", "created_at"),
+        Index("ix_resume_created", "created_at"),
+        Index("ix_resume_status", "status"),
+    )
 
     def __repr__(self):
         return f"<Resume(name='{self.user_name}', original_filename='{self.original_filename}')>"
 
 
-Base.metadata.create_all(engine)
+class ExtractedText(Base):
+    __tablename__ = 'extracted_text'
+    file_hash = Column(String(64), primary_key=True)
+    extractor_version = Column(String)
+    text = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# structured extraction of an upload, reused by every tailoring of it
+class StructuredResume(Base):
+    __tablename__ = 'structured_resume'
+    file_hash = Column(String(64), primary_key=True)
+    parser_version = Column(String)
+    data = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class LLMResult(Base):
+    __tablename__ = 'llm_result'
+    key = Column(String(64), primary_key=True)
+    kind = Column(String)
+    payload = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+# token buckets shared by every worker process; version guards concurrent updates
+class RateLimitBucket(Base):
+    __tablename__ = 'rate_limit_bucket'
+    name = Column(String, primary_key=True)
+    tokens = Column(Float)
+    updated_at = Column(Float)
+    version = Column(Integer, default=0)
+
+
+# statuses of jobs that have not finished yet
+ACTIVE_JOB_STATUSES = ("queued", "processing")
+
+
+class Job(Base):
+    __tablename__ = 'job'
+    id = Column(String(32), primary_key=True)
+    resume_id = Column(Integer, index=True)
+    kind = Column(String)
+    status = Column(String)
+    error = Column(Text)
+    tokens_before = Column(Integer)
+    tokens_after = Column(Integer)
+    # tailored resume JSON, kept for diffs between versions
+    result = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # also refreshed by the queue's heartbeat while the job is queued or processing
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (Index("ix_job_status_updated", "status", "updated_at"),)
+
+    def __repr__(self):
+        return f"<Job(id='{self.id}', kind='{self.kind}', status='{self.status}')>"
+
+
+class Batch(Base):
+    __tablename__ = 'batch'
+    id = Column(String(32), primary_key=True)
+    resume_id = Column(Integer, index=True)
+    status = Column(String)
+    zip_hash = Column(String(64), index=True)
+    zip_size = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BatchItem(Base):
+    __tablename__ = 'batch_item'
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(String(32), index=True)
+    position = Column(Integer)
+    job_description = Column(Text)
+    status = Column(String)
+    error = Column(Text)
+    user_name = Column(String)
+    output_hash = Column(String(64), index=True)
+    output_size = Column(Integer)
+
+
 Session = sessionmaker(bind=engine)
 
 
+# create_all only creates missing tables; columns (all nullable) and indexes added
+# to existing tables since they were created are added here
+def _upgrade_schema() -> None:
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    logger.info(f"Adding column {table.name}.{column.name}")
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+# creates missing tables; run at startup or as a deploy step with `python -m src.database`
+def init_db() -> None:
+    # a file database's directory is created here rather than with the engine, so importing has no side effects
+    if engine.url.get_backend_name() == "sqlite" and engine.url.database not in (None, "", ":memory:"):
+        directory = os.path.dirname(engine.url.database)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    Base.metadata.create_all(engine)
+    _upgrade_schema()
+
+
+def ping_db() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+_async_session_factory = None
+
+
+def get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None and DATABASE_ASYNC_URL:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_session_factory = async_sessionmaker(build_async_engine(DATABASE_ASYNC_URL), expire_on_commit=False)
+    return _async_session_factory
+
+
+# cache rows are saved from worker threads, so two jobs can insert the same key at
+# once; the one that loses updates the row the other inserted
+def _merge(row) -> None:
+    session = Session()
+    try:
+        session.merge(row)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        session.merge(row)
+        session.commit()
+    finally:
+        session.close()
+
+
 @contextmanager
 def get_session():
     session = Session()
@@ -52,11 +267,26 @@ def get_session():
         session.close()
 
 
-def create_resume(filename: str, file_content: bytes) -> int:
+@asynccontextmanager
+async def get_async_session():
+    async with get_async_session_factory()() as session:
+        try:
+            yield session
+            await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Database error: {e}")
+            raise
+
+
+@timed("db_create_resume")
+def create_resume(filename: str, file_hash: str, file_size: int, owner_id: str | None = None) -> int:
     with get_session() as session:
         resume = Resume(
             original_filename=filename,
-            file_content=file_content,
+            file_hash=file_hash,
+            file_size=file_size,
+            owner_id=owner_id,
             status='uploaded'
         )
         session.add(resume)
@@ -64,24 +294,95 @@ def create_resume(filename: str, file_content: bytes) -> int:
         return resume.id
 
 
-def get_resume(resume_id: int) -> dict | None:
+# columns and SQL expressions that get_resume can project
+RESUME_COLUMNS = {
+    **{column.key: column for column in Resume.__table__.columns},
+    "has_output": Resume.output_hash.isnot(None),
+    "has_cover_letter": Resume.cover_letter_hash.isnot(None),
+}
+
+RESUME_METADATA = (
+    "id", "original_filename", "file_hash", "owner_id", "user_name", "created_at",
+    "status", "job_description", "cover_letter_status"
+)
+
+# what a history listing shows; no job descriptions or file contents
+RESUME_LISTING = (
+    "id", "original_filename", "user_name", "created_at", "status",
+    "has_output", "cover_letter_status", "has_cover_letter"
+)
+
+
+@timed("db_get_resume")
+def get_resume(resume_id: int, columns: tuple[str, ...] = RESUME_METADATA) -> dict | None:
     with get_session() as session:
-        resume = session.query(Resume).filter(Resume.id == resume_id).first()
-        if not resume:
+        row = (
+            session.query(*(RESUME_COLUMNS[name].label(name) for name in columns))
+            .filter(Resume.id == resume_id)
+            .first()
+        )
+        if not row:
             return None
-        return {
-            "id": resume.id,
-            "original_filename": resume.original_filename,
-            "file_content": resume.file_content,
-            "user_name": resume.user_name,
-            "created_at": resume.created_at,
-            "status": resume.status,
-            "job_description": resume.job_description,
-            "output_content": resume.output_content,
-            "cover_letter_content": resume.cover_letter_content
-        }
+        return dict(row._mapping)
+
+
+@timed("db_get_resume_by_hash")
+def get_resume_by_hash(file_hash: str, columns: tuple[str, ...] = RESUME_METADATA, owner_id: str | None = None) -> dict | None:
+    with get_session() as session:
+        row = (
+            session.query(*(RESUME_COLUMNS[name].label(name) for name in columns))
+            .filter(Resume.file_hash == file_hash, Resume.owner_id == owner_id)
+            .order_by(Resume.id)
+            .first()
+        )
+        if not row:
+            return None
+        return dict(row._mapping)
+
+
+# newest first, keyset-paginated: `after` is the (created_at, id) of the last row of the previous page
+@timed("db_list_resumes")
+def list_resumes(
+    owner_id: str,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+    status: str | None = None,
+    columns: tuple[str, ...] = RESUME_LISTING
+) -> list[dict]:
+    with get_session() as session:
+        query = (
+            session.query(*(RESUME_COLUMNS[name].label(name) for name in columns))
+            .filter(Resume.owner_id == owner_id)
+        )
+        if status:
+            query = query.filter(Resume.status == status)
+        if after:
+            created_at, resume_id = after
+            query = query.filter(or_(
+                Resume.created_at < created_at,
+                and_(Resume.created_at == created_at, Resume.id < resume_id)
+            ))
+        rows = query.order_by(Resume.created_at.desc(), Resume.id.desc()).limit(limit).all()
+        return [dict(row._mapping) for row in rows]
 
 
+@timed("db_get_resume_async")
+async def get_resume_async(resume_id: int, columns: tuple[str, ...] = RESUME_METADATA) -> dict | None:
+    if get_async_session_factory() is None:
+        return await asyncio.to_thread(get_resume, resume_id, columns)
+
+    async with get_async_session() as session:
+        result = await session.execute(
+            select(*(RESUME_COLUMNS[name].label(name) for name in columns))
+            .where(Resume.id == resume_id)
+        )
+        row = result.first()
+        if not row:
+            return None
+        return dict(row._mapping)
+
+
+@timed("db_update_resume")
 def update_resume(resume_id: int, **fields) -> bool:
     with get_session() as session:
         resume = session.query(Resume).filter(Resume.id == resume_id).first()
@@ -93,10 +394,335 @@ def update_resume(resume_id: int, **fields) -> bool:
         return True
 
 
-def delete_resume(resume_id: int) -> bool:
+# deletes resumes with their jobs and batches; returns the blob keys the deleted rows referenced
+def _delete_resumes(session, resume_ids: list[int]) -> set[str]:
+    keys = set()
+    for row in session.query(Resume.file_hash, Resume.output_hash, Resume.cover_letter_hash).filter(Resume.id.in_(resume_ids)):
+        keys.update(row)
+
+    batch_ids = [batch_id for (batch_id,) in session.query(Batch.id).filter(Batch.resume_id.in_(resume_ids))]
+    if batch_ids:
+        keys.update(key for (key,) in session.query(Batch.zip_hash).filter(Batch.id.in_(batch_ids)))
+        keys.update(key for (key,) in session.query(BatchItem.output_hash).filter(BatchItem.batch_id.in_(batch_ids)))
+        session.query(BatchItem).filter(BatchItem.batch_id.in_(batch_ids)).delete(synchronize_session=False)
+        session.query(Batch).filter(Batch.id.in_(batch_ids)).delete(synchronize_session=False)
+
+    session.query(Job).filter(Job.resume_id.in_(resume_ids)).delete(synchronize_session=False)
+    session.query(Resume).filter(Resume.id.in_(resume_ids)).delete(synchronize_session=False)
+    keys.discard(None)
+    return keys
+
+
+@timed("db_delete_resume")
+def delete_resume(resume_id: int) -> set[str] | None:
     with get_session() as session:
-        resume = session.query(Resume).filter(Resume.id == resume_id).first()
-        if not resume:
+        if not session.query(Resume.id).filter(Resume.id == resume_id).first():
+            return None
+        return _delete_resumes(session, [resume_id])
+
+
+# whether the resume being queried has queued or processing jobs, batches included
+def _active_jobs_exist():
+    return select(Job.id).where(Job.resume_id == Resume.id, Job.status.in_(ACTIVE_JOB_STATUSES)).exists()
+
+
+@timed("db_has_active_jobs")
+def has_active_jobs(resume_id: int) -> bool:
+    with get_session() as session:
+        return session.query(Resume.id).filter(Resume.id == resume_id, _active_jobs_exist()).first() is not None
+
+
+# deletes up to `limit` of the oldest resumes created before the cutoff, in one transaction;
+# returns how many were deleted and the blob keys they referenced
+@timed("db_prune_resumes")
+def prune_resumes(created_before: datetime, limit: int) -> tuple[int, set[str]]:
+    with get_session() as session:
+        resume_ids = [
+            resume_id for (resume_id,) in session.query(Resume.id)
+            .filter(Resume.created_at < created_before)
+            # resumes with queued or processing work, batches included, wait for a later run
+            .filter(or_(Resume.status.is_(None), Resume.status.notin_(ACTIVE_JOB_STATUSES)))
+            .filter(or_(Resume.cover_letter_status.is_(None), Resume.cover_letter_status.notin_(ACTIVE_JOB_STATUSES)))
+            .filter(~_active_jobs_exist())
+            .order_by(Resume.created_at)
+            .limit(limit)
+        ]
+        if not resume_ids:
+            return 0, set()
+        return len(resume_ids), _delete_resumes(session, resume_ids)
+
+
+# the keys no row refers to any more; their cached extractions are deleted with them
+@timed("db_unreferenced_blobs")
+def unreferenced_blobs(keys: set[str]) -> set[str]:
+    if not keys:
+        return set()
+    with get_session() as session:
+        referenced = set()
+        for column in (Resume.file_hash, Resume.output_hash, Resume.cover_letter_hash, Batch.zip_hash, BatchItem.output_hash):
+            referenced.update(key for (key,) in session.query(column).filter(column.in_(keys)).distinct())
+        unreferenced = set(keys) - referenced
+        if unreferenced:
+            session.query(ExtractedText).filter(ExtractedText.file_hash.in_(unreferenced)).delete(synchronize_session=False)
+            session.query(StructuredResume).filter(StructuredResume.file_hash.in_(unreferenced)).delete(synchronize_session=False)
+        return unreferenced
+
+
+@timed("db_get_extracted_text")
+def get_extracted_text(file_hash: str, extractor_version: str) -> str | None:
+    with get_session() as session:
+        row = session.get(ExtractedText, file_hash)
+        if not row or row.extractor_version != extractor_version:
+            return None
+        return row.text
+
+
+@timed("db_save_extracted_text")
+def save_extracted_text(file_hash: str, extractor_version: str, text: str) -> None:
+    _merge(ExtractedText(
+        file_hash=file_hash,
+        extractor_version=extractor_version,
+        text=text
+    ))
+
+
+@timed("db_get_structured_resume")
+def get_structured_resume(file_hash: str, parser_version: str) -> str | None:
+    with get_session() as session:
+        row = session.get(StructuredResume, file_hash)
+        if not row or row.parser_version != parser_version:
+            return None
+        return row.data
+
+
+@timed("db_save_structured_resume")
+def save_structured_resume(file_hash: str, parser_version: str, data: str) -> None:
+    _merge(StructuredResume(
+        file_hash=file_hash,
+        parser_version=parser_version,
+        data=data
+    ))
+
+
+@timed("db_get_llm_result")
+def get_llm_result(key: str, max_age_seconds: int) -> str | None:
+    with get_session() as session:
+        row = session.get(LLMResult, key)
+        if not row:
+            return None
+        if row.created_at < datetime.utcnow() - timedelta(seconds=max_age_seconds):
+            session.delete(row)
+            return None
+        row.last_used_at = datetime.utcnow()
+        return row.payload
+
+
+@timed("db_save_llm_result")
+def save_llm_result(key: str, kind: str, payload: str, max_rows: int) -> None:
+    _merge(LLMResult(key=key, kind=kind, payload=payload, created_at=datetime.utcnow(), last_used_at=datetime.utcnow()))
+    with get_session() as session:
+        # evict least recently used rows beyond the size bound
+        stale = (
+            session.query(LLMResult.key)
+            .order_by(LLMResult.last_used_at.desc())
+            .offset(max_rows)
+            .subquery()
+        )
+        session.query(LLMResult).filter(LLMResult.key.in_(select(stale.c.key))).delete(synchronize_session=False)
+
+
+def _create_rate_limit_bucket(name: str, capacity: float) -> None:
+    session = Session()
+    try:
+        session.add(RateLimitBucket(name=name, tokens=capacity, updated_at=time.time(), version=0))
+        session.commit()
+    except IntegrityError:
+        # another worker created it first
+        session.rollback()
+    finally:
+        session.close()
+
+
+# takes `amount` from every bucket, given as name -> (amount, capacity, refill per second),
+# or none of them; returns 0 on success, else the seconds until all of them could be taken
+@timed("db_take_rate_limit_tokens")
+def take_rate_limit_tokens(costs: dict[str, tuple[float, float, float]]) -> float:
+    while True:
+        now = time.time()
+        with get_session() as session:
+            buckets = {bucket.name: bucket for bucket in session.query(RateLimitBucket).filter(RateLimitBucket.name.in_(costs))}
+            missing = [name for name in costs if name not in buckets]
+            if missing:
+                session.rollback()
+                for name in missing:
+                    _create_rate_limit_bucket(name, costs[name][1])
+                continue
+
+            wait = 0.0
+            remaining = {}
+            for name, (amount, capacity, rate) in costs.items():
+                bucket = buckets[name]
+                amount = min(amount, capacity)
+                available = min(capacity, bucket.tokens + max(0.0, now - bucket.updated_at) * rate)
+                if available < amount:
+                    wait = max(wait, (amount - available) / rate)
+                remaining[name] = available - amount
+            if wait:
+                return wait
+
+            updated = 0
+            for name, tokens in remaining.items():
+                updated += session.query(RateLimitBucket).filter(
+                    RateLimitBucket.name == name, RateLimitBucket.version == buckets[name].version
+                ).update({"tokens": tokens, "updated_at": now, "version": buckets[name].version + 1}, synchronize_session=False)
+            if updated == len(remaining):
+                return 0.0
+            # another worker took tokens in between; roll back and try again
+            session.rollback()
+
+
+@timed("db_create_job")
+def create_job(resume_id: int, kind: str, resume_fields: tuple[str, ...], status: str = "queued") -> str:
+    with get_session() as session:
+        job = Job(id=uuid.uuid4().hex, resume_id=resume_id, kind=kind, status=status)
+        session.add(job)
+        if resume_fields:
+            session.query(Resume).filter(Resume.id == resume_id).update({field: status for field in resume_fields})
+        return job.id
+
+
+@timed("db_get_job")
+def get_job(job_id: str) -> dict | None:
+    with get_session() as session:
+        job = session.get(Job, job_id)
+        if not job:
+            return None
+        return {
+            "id": job.id,
+            "resume_id": job.resume_id,
+            "kind": job.kind,
+            "status": job.status,
+            "error": job.error,
+            "tokens_before": job.tokens_before,
+            "tokens_after": job.tokens_after,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at
+        }
+
+
+@timed("db_get_job_result")
+def get_job_result(job_id: str) -> dict | None:
+    with get_session() as session:
+        row = session.query(Job.resume_id, Job.result).filter(Job.id == job_id).first()
+        if not row:
+            return None
+        return dict(row._mapping)
+
+
+@timed("db_set_job_status")
+def set_job_status(job_id: str, status: str, resume_fields: tuple[str, ...], error: str | None = None, **fields) -> bool:
+    with get_session() as session:
+        job = session.get(Job, job_id)
+        if not job:
             return False
-        session.delete(resume)
+        job.status = status
+        job.error = error
+        for key, value in fields.items():
+            setattr(job, key, value)
+        if resume_fields:
+            session.query(Resume).filter(Resume.id == job.resume_id).update({field: status for field in resume_fields})
         return True
+
+
+@timed("db_touch_jobs")
+def touch_jobs(job_ids: list[str]) -> None:
+    with get_session() as session:
+        session.query(Job).filter(Job.id.in_(job_ids)).update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+
+
+# fails queued and processing jobs nobody has heartbeated since `updated_before` (their process
+# crashed or was restarted), with the resume columns that mirror them, given per kind
+@timed("db_fail_stale_jobs")
+def fail_stale_jobs(updated_before: datetime, resume_fields: dict[str, tuple[str, ...]], error: str) -> int:
+    with get_session() as session:
+        jobs = (
+            session.query(Job.id, Job.resume_id, Job.kind)
+            .filter(Job.status.in_(ACTIVE_JOB_STATUSES), Job.updated_at < updated_before)
+            .all()
+        )
+        for job in jobs:
+            for field in resume_fields.get(job.kind, ()):
+                column = getattr(Resume, field)
+                session.query(Resume).filter(Resume.id == job.resume_id, column.in_(ACTIVE_JOB_STATUSES)).update(
+                    {field: "failed"}, synchronize_session=False
+                )
+        if jobs:
+            session.query(Job).filter(Job.id.in_([job.id for job in jobs])).update(
+                {"status": "failed", "error": error}, synchronize_session=False
+            )
+        return len(jobs)
+
+
+@timed("db_create_batch")
+def create_batch(resume_id: int, job_descriptions: list[str]) -> str:
+    with get_session() as session:
+        batch = Batch(id=uuid.uuid4().hex, resume_id=resume_id, status='queued')
+        session.add(batch)
+        session.add_all(
+            BatchItem(batch_id=batch.id, position=position, job_description=job_description, status='queued')
+            for position, job_description in enumerate(job_descriptions)
+        )
+        return batch.id
+
+
+@timed("db_get_batch")
+def get_batch(batch_id: str) -> dict | None:
+    with get_session() as session:
+        batch = session.get(Batch, batch_id)
+        if not batch:
+            return None
+        items = (
+            session.query(BatchItem)
+            .filter(BatchItem.batch_id == batch_id)
+            .order_by(BatchItem.position)
+            .all()
+        )
+        return {
+            "id": batch.id,
+            "resume_id": batch.resume_id,
+            "status": batch.status,
+            "zip_hash": batch.zip_hash,
+            "zip_size": batch.zip_size,
+            "created_at": batch.created_at,
+            "updated_at": batch.updated_at,
+            "items": [
+                {
+                    "id": item.id,
+                    "position": item.position,
+                    "job_description": item.job_description,
+                    "status": item.status,
+                    "error": item.error,
+                    "user_name": item.user_name,
+                    "output_hash": item.output_hash,
+                    "output_size": item.output_size
+                }
+                for item in items
+            ]
+        }
+
+
+@timed("db_update_batch")
+def update_batch(batch_id: str, **fields) -> bool:
+    with get_session() as session:
+        return session.query(Batch).filter(Batch.id == batch_id).update(fields) > 0
+
+
+@timed("db_update_batch_item")
+def update_batch_item(item_id: int, **fields) -> bool:
+    with get_session() as session:
+        return session.query(BatchItem).filter(BatchItem.id == item_id).update(fields) > 0
+
+
+if __name__ == "__main__":
+    init_db()
+    print(f"Database schema is up to date ({make_url(DATABASE_URL).render_as_string(hide_password=True)})")
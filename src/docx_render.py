@@ -0,0 +1,230 @@
+import os
+import re
+import time
+import zlib
+import struct
+import zipfile
+from xml.sax.saxutils import escape
+
+DOCX_TEMPLATE_PATH = os.getenv("DOCX_TEMPLATE_PATH")
+
+DOCUMENT_PART = "word/document.xml"
+
+DOCUMENT_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><w:body>'
+)
+
+# characters python-docx would refuse, which LLM output occasionally contains
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+TWIPS_PER_INCH = 1440
+
+
+def _default_template_path() -> str:
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+
+
+def _dos_datetime(timestamp: float) -> tuple[int, int]:
+    t = time.localtime(timestamp)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+def _deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _local_entry(name: bytes, data: bytes, compressed: bytes, dos_time: int, dos_date: int) -> tuple[bytes, tuple]:
+    crc = zlib.crc32(data)
+    meta = (name, crc, len(compressed), len(data), dos_time, dos_date)
+    header = struct.pack(
+        "<4s2B4HL2L2H", b"PK\x03\x04", 20, 0, 0, 8, dos_time, dos_date,
+        crc, len(compressed), len(data), len(name), 0
+    )
+    return header + name + compressed, meta
+
+
+def _central_record(meta: tuple, offset: int) -> bytes:
+    name, crc, compressed_size, size, dos_time, dos_date = meta
+    return struct.pack(
+        "<4s4B4HL2L5H2L", b"PK\x01\x02", 20, 0, 20, 0, 0, 8, dos_time, dos_date,
+        crc, compressed_size, size, len(name), 0, 0, 0, 0, 0, offset
+    ) + name
+
+
+# a DOCX package whose static parts (styles, numbering, theme, ...) are
+# deflated once; render() only compresses a new word/document.xml
+class DocxTemplate:
+    def __init__(self, path: str):
+        dos_time, dos_date = _dos_datetime(time.time())
+        prefix = []
+        central = []
+        offset = 0
+
+        with zipfile.ZipFile(path) as package:
+            for info in package.infolist():
+                if info.filename == DOCUMENT_PART:
+                    continue
+                data = package.read(info)
+                entry, meta = _local_entry(info.filename.encode(), data, _deflate(data), dos_time, dos_date)
+                central.append(_central_record(meta, offset))
+                prefix.append(entry)
+                offset += len(entry)
+
+        self._prefix = b"".join(prefix)
+        self._central = b"".join(central)
+        self._count = len(central)
+        self._dos_time = dos_time
+        self._dos_date = dos_date
+
+    def render(self, document_xml: str) -> bytes:
+        data = document_xml.encode("utf-8")
+        entry, meta = _local_entry(DOCUMENT_PART.encode(), data, _deflate(data), self._dos_time, self._dos_date)
+
+        central_offset = len(self._prefix) + len(entry)
+        central = self._central + _central_record(meta, len(self._prefix))
+        end = struct.pack(
+            "<4s4H2LH", b"PK\x05\x06", 0, 0, self._count + 1, self._count + 1,
+            len(central), central_offset, 0
+        )
+        return b"".join((self._prefix, entry, central, end))
+
+
+_template: DocxTemplate | None = None
+
+
+def get_template() -> DocxTemplate:
+    global _template
+    if _template is None:
+        _template = DocxTemplate(DOCX_TEMPLATE_PATH or _default_template_path())
+    return _template
+
+
+def run(text: str, bold: bool = False, italic: bool = False, size: float | None = None, color: str | None = None) -> str:
+    props = []
+    if bold:
+        props.append("<w:b/>")
+    if italic:
+        props.append("<w:i/>")
+    if color:
+        props.append(f'<w:color w:val="{color}"/>')
+    if size:
+        props.append(f'<w:sz w:val="{round(size * 2)}"/>')
+    rpr = f"<w:rPr>{''.join(props)}</w:rPr>" if props else ""
+    # line breaks and tabs become <w:br/> and <w:tab/>, as python-docx does
+    text = escape(INVALID_XML_CHARS.sub("", str(text)))
+    text = text.replace("\t", '</w:t><w:tab/><w:t xml:space="preserve">')
+    text = text.replace("\n", '</w:t><w:br/><w:t xml:space="preserve">')
+    return f'<w:r>{rpr}<w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+def paragraph(*runs: str, style: str | None = None, align: str | None = None,
+              space_before: float | None = None, space_after: float | None = None) -> str:
+    props = []
+    if style:
+        props.append(f'<w:pStyle w:val="{style}"/>')
+    if space_before is not None or space_after is not None:
+        spacing = ""
+        if space_before is not None:
+            spacing += f' w:before="{round(space_before * 20)}"'
+        if space_after is not None:
+            spacing += f' w:after="{round(space_after * 20)}"'
+        props.append(f"<w:spacing{spacing}/>")
+    if align:
+        props.append(f'<w:jc w:val="{align}"/>')
+    ppr = f"<w:pPr>{''.join(props)}</w:pPr>" if props else ""
+    return f"<w:p>{ppr}{''.join(runs)}</w:p>"
+
+
+def section_properties(margin_inches: float) -> str:
+    margin = round(margin_inches * TWIPS_PER_INCH)
+    return (
+        '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+        f'<w:pgMar w:top="{margin}" w:right="{margin}" w:bottom="{margin}" w:left="{margin}" '
+        'w:header="720" w:footer="720" w:gutter="0"/></w:sectPr>'
+    )
+
+
+def document(body: list[str], margin_inches: float) -> str:
+    return DOCUMENT_HEADER + "".join(body) + section_properties(margin_inches) + "</w:body></w:document>"
+
+
+def section_heading(text: str) -> str:
+    return paragraph(run(text.upper(), bold=True, size=11, color="003366"), space_before=10, space_after=2)
+
+
+def render_resume(resume_data: dict) -> bytes:
+    body = []
+
+    # header
+    body.append(paragraph(run(resume_data['name'], bold=True, size=20, color="000000"), align="center", space_after=4))
+
+    contact_parts = []
+    for field in ['email', 'phone', 'location', 'github', 'linkedin', 'portfolio']:
+        value = (resume_data.get(field) or '').strip()
+        if value:
+            contact_parts.append(value)
+    body.append(paragraph(run(' | '.join(contact_parts), size=10, color="404040"), align="center", space_after=10))
+
+    # professional summary
+    if resume_data.get('professional_summary'):
+        body.append(section_heading('Professional Summary'))
+        body.append(paragraph(run(resume_data['professional_summary']), space_after=8))
+
+    # professional experience
+    body.append(section_heading('Professional Experience'))
+    for job in resume_data.get('work_experience', []):
+        body.append(paragraph(run(job['title'], bold=True, size=11), space_after=2))
+        body.append(paragraph(
+            run(f"{job['company']} | ", size=10),
+            run(job['duration'], italic=True, size=10, color="404040"),
+            space_after=4
+        ))
+        for bullet in job['bullets']:
+            body.append(paragraph(run(bullet), style="ListBullet", space_after=2))
+        body.append(paragraph(space_after=6))
+
+    # key projects
+    if resume_data.get('projects'):
+        body.append(section_heading('Key Projects'))
+        for project in resume_data['projects']:
+            body.append(paragraph(run(project['name'], bold=True, size=10.5), space_after=2))
+            for bullet in project['bullets']:
+                body.append(paragraph(run(bullet), style="ListBullet", space_after=2))
+            body.append(paragraph(space_after=4))
+
+    # technical skills
+    if resume_data.get('skills'):
+        body.append(section_heading('Technical Skills'))
+        body.append(paragraph(run(' | '.join(resume_data['skills'])), space_after=8))
+
+    # core competencies
+    if resume_data.get('soft_skills'):
+        body.append(section_heading('Core Competencies'))
+        body.append(paragraph(run(' | '.join(resume_data['soft_skills'])), space_after=8))
+
+    # education
+    if resume_data.get('education'):
+        body.append(section_heading('Education'))
+        for edu in resume_data['education']:
+            body.append(paragraph(
+                run(edu['degree'], bold=True, size=10.5),
+                run(f" - {edu['institution']}, {edu['year']}"),
+                space_after=4
+            ))
+
+    return get_template().render(document(body, margin_inches=0.5))
+
+
+def render_cover_letter(text: str) -> bytes:
+    body = [
+        paragraph(run(p.strip()), space_after=12)
+        for p in text.strip().split('\n\n')
+        if p.strip()
+    ]
+    return get_template().render(document(body, margin_inches=1))
@@ -0,0 +1,74 @@
+import io
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+BODY, PARAGRAPH, TEXT = f"{W}body", f"{W}p", f"{W}t"
+
+DOCUMENT_PART = "word/document.xml"
+HEADER_PART = re.compile(r"word/header\d*\.xml")
+FOOTER_PART = re.compile(r"word/footer\d*\.xml")
+
+RUN_CONTENT = {f"{W}tab": "\t", f"{W}br": "\n", f"{W}cr": "\n", f"{W}noBreakHyphen": "-"}
+# subtrees whose content is not document text: a Fallback repeats its Choice (e.g. a VML
+# copy of a text box) and tab stop definitions use the same w:tab element as tab characters
+SKIPPED = {MC_FALLBACK, f"{W}tabs"}
+
+
+def iter_paragraphs(part):
+    # paragraphs nest (a text box is anchored in a run of another paragraph), so each open one gets a buffer
+    stack = []
+    skipped = 0
+    depth = body_depth = 0
+    body = None
+    for event, elem in iterparse(part, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if elem.tag in SKIPPED:
+                skipped += 1
+            elif elem.tag == PARAGRAPH and not skipped:
+                stack.append([])
+            elif elem.tag == BODY:
+                body, body_depth = elem, depth
+            continue
+
+        depth -= 1
+        if elem.tag in SKIPPED:
+            skipped -= 1
+        elif skipped:
+            continue
+        elif elem.tag == TEXT and stack:
+            stack[-1].append(elem.text or "")
+        elif elem.tag in RUN_CONTENT and stack:
+            stack[-1].append(RUN_CONTENT[elem.tag])
+        elif elem.tag == PARAGRAPH:
+            yield "".join(stack.pop())
+            elem.clear()
+
+        # drop finished top-level blocks so memory stays flat on large documents
+        if body is not None and depth == body_depth:
+            body.clear()
+
+
+# body text plus tables, text boxes, headers and footers, read straight from the XML
+# without building the python-docx object model
+def extract_docx_text(file_bytes: bytes) -> str:
+    lines = []
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as package:
+        names = package.namelist()
+        headers = sorted(name for name in names if HEADER_PART.fullmatch(name))
+        footers = sorted(name for name in names if FOOTER_PART.fullmatch(name))
+
+        # sections repeat the same header and footer (first page, even pages, ...)
+        seen = set()
+        for name in headers + [DOCUMENT_PART] + footers:
+            with package.open(name) as part:
+                for line in iter_paragraphs(part):
+                    if name != DOCUMENT_PART:
+                        if line in seen:
+                            continue
+                        seen.add(line)
+                    lines.append(line)
+    return "\n".join(lines).strip()
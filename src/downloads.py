@@ -0,0 +1,75 @@
+import re
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, FileResponse, StreamingResponse
+
+from src.blobstore import get_blob_store, LocalBlobStore, BlobNotFound
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start > end or start >= size:
+        raise HTTPException(416, "Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+# serves an immutable blob with a strong ETag (its content hash), answering
+# If-None-Match with 304 and single byte ranges with 206
+def blob_response(request: Request, key: str, size: int, filename: str, media_type: str = DOCX_MEDIA_TYPE) -> Response:
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Disposition"})
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, size)
+
+    store = get_blob_store()
+    if byte_range is None and isinstance(store, LocalBlobStore):
+        if not store.exists(key):
+            raise HTTPException(404, "File not found in storage")
+        # lets the server use sendfile when it supports zero-copy sends
+        return FileResponse(store.path(key), media_type=media_type, headers=headers)
+
+    start, end = byte_range or (0, size - 1)
+    try:
+        chunks = store.open(key, start, end)
+    except BlobNotFound:
+        raise HTTPException(404, "File not found in storage")
+
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range is None:
+        return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(chunks, status_code=206, media_type=media_type, headers=headers)
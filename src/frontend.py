@@ -1,15 +1,54 @@
 import streamlit as st
 import requests
+import time
+import uuid
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 API_URL = os.getenv("API_URL", "http://127.0.0.1:8000")
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "300"))
+
+
+# resumes uploaded from this browser session are only visible to it
+def owner_headers() -> dict:
+    return {"X-Owner-Id": st.session_state.owner_id}
+
+
+def wait_for_job(response) -> bool:
+    if response.status_code != 202:
+        return False
+    job_id = response.json()["job_id"]
+    deadline = time.monotonic() + JOB_TIMEOUT
+    while time.monotonic() < deadline:
+        job = requests.get(f"{API_URL}/jobs/{job_id}", headers=owner_headers()).json()
+        if job["status"] == "completed":
+            return True
+        if job["status"] == "failed":
+            return False
+        time.sleep(JOB_POLL_INTERVAL)
+    return False
+
+
+def render_changes(job_id: str) -> None:
+    response = requests.get(f"{API_URL}/jobs/{job_id}/diff", headers=owner_headers())
+    if response.status_code != 200:
+        return
+    changes = response.json()["changes"]
+    with st.expander(f"What changed ({len(changes)})", expanded=True):
+        for change in changes:
+            after = change["after"]
+            st.markdown(f"**{change['field']}**")
+            st.markdown("\n".join(f"- {item}" for item in after) if isinstance(after, list) else str(after))
+
 
 st.set_page_config(page_title="Resume Tailor", page_icon="", layout="centered")
 st.title("Resume Tailor & Cover Letter Generator")
 
+if "owner_id" not in st.session_state:
+    st.session_state.owner_id = uuid.uuid4().hex
 if "resume_id" not in st.session_state:
     st.session_state.resume_id = None
 if "status" not in st.session_state:
@@ -20,7 +59,7 @@ uploaded_file = st.file_uploader("Upload your resume", type=["pdf", "docx"])
 if uploaded_file and st.session_state.resume_id is None:
     with st.spinner("Uploading..."):
         files = {"file": (uploaded_file.name, uploaded_file.getvalue())}
-        response = requests.post(f"{API_URL}/upload", files=files)
+        response = requests.post(f"{API_URL}/upload", files=files, headers=owner_headers())
         if response.status_code == 200:
             data = response.json()
             st.session_state.resume_id = data["id"]
@@ -33,6 +72,8 @@ if st.session_state.resume_id:
     st.info(f"Status: {st.session_state.status}")
 
 job_description = st.text_area("Paste the job description", height=200)
+regenerate = st.checkbox("Regenerate (ignore previously generated results)")
+params = {"regenerate": "true"} if regenerate else {}
 
 col1, col2 = st.columns(2)
 
@@ -42,11 +83,13 @@ with col1:
             response = requests.post(
                 f"{API_URL}/resumes/{st.session_state.resume_id}/tailor",
                 data=job_description,
-                headers={"Content-Type": "text/plain"}
+                params=params,
+                headers={"Content-Type": "text/plain", **owner_headers()}
             )
-            if response.status_code == 200:
+            if wait_for_job(response):
                 st.session_state.status = "completed"
                 st.success("Resume tailored!")
+                render_changes(response.json()["job_id"])
             else:
                 st.error("Tailoring failed.")
 
@@ -56,13 +99,28 @@ with col2:
             response = requests.post(
                 f"{API_URL}/resumes/{st.session_state.resume_id}/cover-letter",
                 data=job_description,
-                headers={"Content-Type": "text/plain"}
+                params=params,
+                headers={"Content-Type": "text/plain", **owner_headers()}
             )
-            if response.status_code == 200:
+            if wait_for_job(response):
                 st.success("Cover letter generated!")
             else:
                 st.error("Generation failed.")
 
+if st.button("Tailor Resume + Cover Letter", disabled=not st.session_state.resume_id or not job_description, use_container_width=True):
+    with st.spinner("Generating resume and cover letter..."):
+        response = requests.post(
+            f"{API_URL}/resumes/{st.session_state.resume_id}/generate",
+            data=job_description,
+            params=params,
+            headers={"Content-Type": "text/plain", **owner_headers()}
+        )
+        if wait_for_job(response):
+            st.session_state.status = "completed"
+            st.success("Resume and cover letter generated!")
+        else:
+            st.error("Generation failed.")
+
 st.divider()
 st.subheader("Downloads")
 
@@ -70,7 +128,7 @@ dl_col1, dl_col2 = st.columns(2)
 
 with dl_col1:
     if st.button("Download Tailored Resume", disabled=not st.session_state.resume_id):
-        response = requests.get(f"{API_URL}/resumes/{st.session_state.resume_id}/download")
+        response = requests.get(f"{API_URL}/resumes/{st.session_state.resume_id}/download", headers=owner_headers())
         if response.status_code == 200:
             filename = response.headers.get("content-disposition", "").split("filename=")[-1].strip('"') or "tailored_resume.docx"
             st.download_button("Save Resume", response.content, file_name=filename, mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
@@ -79,7 +137,7 @@ with dl_col1:
 
 with dl_col2:
     if st.button("Download Cover Letter", disabled=not st.session_state.resume_id):
-        response = requests.get(f"{API_URL}/resumes/{st.session_state.resume_id}/cover-letter/download")
+        response = requests.get(f"{API_URL}/resumes/{st.session_state.resume_id}/cover-letter/download", headers=owner_headers())
         if response.status_code == 200:
             filename = response.headers.get("content-disposition", "").split("filename=")[-1].strip('"') or "cover_letter.docx"
             st.download_button("Save Cover Letter", response.content, file_name=filename, mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
@@ -0,0 +1,159 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from src.admission import admission, Overloaded
+from src.database import create_job, set_job_status, touch_jobs, fail_stale_jobs
+from src.llm import is_rate_limit_error, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "32"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# queued and processing jobs are refreshed this often; ones left alone for several
+# intervals belonged to a process that is gone and are failed by any other
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+JOB_STALE_AFTER = 4 * JOB_HEARTBEAT_INTERVAL
+INTERRUPTED = "Interrupted by a server restart"
+# times a job that hit the model capacity (admission or provider rate limit) is queued again
+JOB_MAX_REQUEUES = int(os.getenv("JOB_MAX_REQUEUES", "5"))
+
+# resume columns that mirror the latest job status for each kind
+RESUME_STATUS_FIELDS = {
+    "tailor": ("status",),
+    "cover_letter": ("cover_letter_status",),
+    "generate": ("status", "cover_letter_status"),
+    "batch": (),
+}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS, maxsize: int = JOB_QUEUE_SIZE):
+        self.workers = workers
+        self.maxsize = maxsize
+        self._queue = None
+        self._tasks = []
+        # queued or processing in this process
+        self._active = set()
+        # waiting to be queued again after hitting the model capacity, task -> job
+        self._deferred = {}
+        # model calls the queued and deferred jobs will make
+        self.backlog = 0
+        # assumed until jobs have finished
+        self._job_seconds = 5.0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        for task in [*self._tasks, *self._deferred]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._deferred, return_exceptions=True)
+        self._tasks = []
+
+        # queued and deferred jobs will never run
+        jobs = list(self._deferred.values())
+        while not self._queue.empty():
+            jobs.append(self._queue.get_nowait())
+        for job_id, kind, *_ in jobs:
+            await asyncio.to_thread(set_job_status, job_id, "failed", RESUME_STATUS_FIELDS[kind], error=INTERRUPTED)
+        self._deferred.clear()
+        self._active.clear()
+        self.backlog = 0
+        self._queue = None
+
+    # seconds until the jobs queued now have started, from recent job durations
+    def estimated_wait(self) -> float:
+        if self._queue is None:
+            return 0.0
+        return self._queue.qsize() * self._job_seconds / self.workers
+
+    # `calls` is the number of model calls the job makes, e.g. one per batch item
+    async def submit(self, resume_id: int, kind: str, fn, *args, calls: int = 1) -> str:
+        if self._queue is None or self._queue.full():
+            raise QueueFull()
+
+        job_id = await asyncio.to_thread(create_job, resume_id, kind, RESUME_STATUS_FIELDS[kind])
+        # the queue can fill up while the job row is written
+        if self._queue is None or self._queue.full():
+            await asyncio.to_thread(set_job_status, job_id, "failed", RESUME_STATUS_FIELDS[kind], error="Job queue is full")
+            raise QueueFull()
+        self._queue.put_nowait((job_id, kind, fn, args, calls, 0))
+        self._active.add(job_id)
+        self.backlog += calls
+        return job_id
+
+    # jobs run outside the queue, like streamed responses, are heartbeated while they run
+    def track(self, job_id: str) -> None:
+        self._active.add(job_id)
+
+    def untrack(self, job_id: str) -> None:
+        self._active.discard(job_id)
+
+    def _defer(self, job: tuple, delay: float) -> None:
+        async def requeue():
+            await asyncio.sleep(delay)
+            await self._queue.put(job)
+            self._deferred.pop(task, None)
+
+        task = asyncio.create_task(requeue())
+        self._deferred[task] = job
+        self.backlog += job[4]
+
+    async def _heartbeat(self) -> None:
+        while True:
+            try:
+                if self._active:
+                    await asyncio.to_thread(touch_jobs, list(self._active))
+                updated_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_AFTER)
+                failed = await asyncio.to_thread(fail_stale_jobs, updated_before, RESUME_STATUS_FIELDS, INTERRUPTED)
+                if failed:
+                    logger.warning(f"Failed {failed} jobs left behind by a stopped process")
+            except Exception:
+                logger.exception("Job heartbeat failed")
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job_id, kind, fn, args, calls, attempt = job
+            self.backlog -= calls
+            resume_fields = RESUME_STATUS_FIELDS[kind]
+            start = time.monotonic()
+            deferred = False
+            try:
+                await asyncio.to_thread(set_job_status, job_id, "processing", resume_fields)
+                # job functions may return extra job fields, e.g. token counts
+                fields = await fn(*args)
+                await asyncio.to_thread(set_job_status, job_id, "completed", resume_fields, **(fields or {}))
+            except asyncio.CancelledError:
+                await asyncio.to_thread(set_job_status, job_id, "failed", resume_fields, error=INTERRUPTED)
+                raise
+            except Exception as e:
+                if (isinstance(e, Overloaded) or is_rate_limit_error(e)) and attempt < JOB_MAX_REQUEUES:
+                    # model capacity is exhausted for now; run the job again once it is back,
+                    # behind the calls of the jobs already waiting
+                    delay = max(retry_after_seconds(e, 2 ** attempt), admission.estimated_wait(self.backlog))
+                    logger.warning(f"Job {job_id} ({kind}) requeued in {delay:.1f}s: {e}")
+                    await asyncio.to_thread(set_job_status, job_id, "queued", resume_fields)
+                    self._defer((job_id, kind, fn, args, calls, attempt + 1), delay)
+                    deferred = True
+                else:
+                    logger.exception(f"Job {job_id} ({kind}) failed")
+                    await asyncio.to_thread(set_job_status, job_id, "failed", resume_fields, error=str(e))
+            finally:
+                if not deferred:
+                    self._active.discard(job_id)
+                    self._job_seconds += 0.1 * (time.monotonic() - start - self._job_seconds)
+                self._queue.task_done()
+
+
+job_queue = JobQueue()
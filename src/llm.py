@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import functools
+from collections import deque
+
+from src.metrics import LLM_EVENTS
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+AI_MODEL = os.getenv("AI_MODEL", "gpt-4o-mini")
+VISION_MODEL = os.getenv("VISION_MODEL", "gpt-4o-mini")
+# JSON list of providers tried in order, e.g.
+# [{"name": "groq", "base_url": "https://api.groq.com/openai/v1", "api_key_env": "GROQ_API_KEY", "model": "llama-3.3-70b-versatile"}, ...]
+LLM_PROVIDERS = os.getenv("LLM_PROVIDERS")
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "200"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "50"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+# fire a second attempt (on the next provider if there is one) when the first is slower than the p95
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))
+# hedge delay used until enough latencies have been observed
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "30"))
+LLM_LATENCY_WINDOW = 200
+LLM_LATENCY_MIN_SAMPLES = 20
+
+# openai and httpx are imported on first use; together they are most of the app's import time
+
+
+def retry_after_seconds(error: Exception, default: float = 1.0) -> float:
+    if getattr(error, "retry_after", None) is not None:
+        return error.retry_after
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[header]) * scale
+        except (KeyError, ValueError, TypeError):
+            continue
+    return default
+
+
+def is_retryable(error: Exception) -> bool:
+    from openai import APIStatusError, APIConnectionError, APITimeoutError, RateLimitError
+
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    from openai import RateLimitError
+
+    return isinstance(error, RateLimitError)
+
+
+class Provider:
+    def __init__(self, name: str, api_key: str, base_url: str | None = None, model: str = AI_MODEL,
+                 vision_model: str | None = None, timeout: float = LLM_TIMEOUT):
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.vision_model = vision_model or model
+        self.timeout = timeout
+        self._client = None
+        self._latencies = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            timeout = httpx.Timeout(self.timeout, connect=LLM_CONNECT_TIMEOUT)
+            http_client = httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+                )
+            )
+            # retries are done here, with jitter and failover, not by the SDK
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=timeout,
+                max_retries=0,
+                http_client=http_client
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def observe(self, kind: str, seconds: float) -> None:
+        self._latencies.setdefault(kind, deque(maxlen=LLM_LATENCY_WINDOW)).append(seconds)
+
+    def hedge_delay(self, kind: str) -> float:
+        latencies = sorted(self._latencies.get(kind, ()))
+        if len(latencies) < LLM_LATENCY_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY
+        return max(LLM_HEDGE_MIN_DELAY, latencies[int(len(latencies) * 0.95)])
+
+
+def load_providers() -> list[Provider]:
+    if not LLM_PROVIDERS:
+        if not OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is not set. Add it to your .env file.")
+        return [Provider("default", OPENAI_API_KEY, OPENAI_BASE_URL, AI_MODEL, VISION_MODEL)]
+
+    providers = []
+    for i, config in enumerate(json.loads(LLM_PROVIDERS)):
+        api_key = config.get("api_key") or os.getenv(config.get("api_key_env", "OPENAI_API_KEY"))
+        if not api_key:
+            raise ValueError(f"No API key for LLM provider {config.get('name', i)}")
+        providers.append(Provider(
+            config.get("name", f"provider{i}"),
+            api_key,
+            config.get("base_url"),
+            config.get("model", AI_MODEL),
+            config.get("vision_model", VISION_MODEL if "model" not in config else None),
+            float(config.get("timeout", LLM_TIMEOUT))
+        ))
+    if not providers:
+        raise ValueError("LLM_PROVIDERS must list at least one provider")
+    return providers
+
+
+# validated on first use, so a missing key fails readiness rather than the import
+@functools.lru_cache(maxsize=None)
+def get_providers() -> list[Provider]:
+    return load_providers()
+
+
+async def close_client() -> None:
+    if get_providers.cache_info().currsize:
+        for provider in get_providers():
+            await provider.close()
+
+
+async def _with_retries(provider: Provider, kind: str, create):
+    from openai import APIError
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            return await create()
+        except APIError as e:
+            retry_after = retry_after_seconds(e, 0)
+            # a long Retry-After is better spent on the next provider
+            if attempt == LLM_MAX_RETRIES or not is_retryable(e) or retry_after > LLM_RETRY_MAX_DELAY:
+                raise
+            # full jitter, but never sooner than the provider asked for
+            delay = max(retry_after, random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt)))
+            LLM_EVENTS.inc(provider=provider.name, event="retry")
+            logger.warning(f"LLM {kind} call to {provider.name} failed ({e.__class__.__name__}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+async def _attempt(provider: Provider, kind: str, vision: bool, kwargs: dict):
+    model = provider.vision_model if vision else provider.model
+    start = time.monotonic()
+    response = await _with_retries(provider, kind, lambda: provider.client.chat.completions.create(model=model, **kwargs))
+    provider.observe(kind, time.monotonic() - start)
+    return response, model
+
+
+async def _hedged(primary, backup, delay: float, provider: Provider):
+    tasks = {asyncio.create_task(primary)}
+    hedged = False
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            LLM_EVENTS.inc(provider=provider.name, event="hedge")
+            tasks.add(asyncio.create_task(backup))
+            hedged = True
+
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # the backup coroutine is never awaited when no hedge was needed
+        if not hedged:
+            backup.close()
+        for task in tasks:
+            task.cancel()
+
+
+# returns (response, model) from the first provider that answers
+async def chat_completion(kind: str, vision: bool = False, **kwargs):
+    from openai import APIError
+
+    providers = get_providers()
+    error = None
+    for i, provider in enumerate(providers):
+        try:
+            if LLM_HEDGE:
+                backup = providers[i + 1] if i + 1 < len(providers) else provider
+                return await _hedged(
+                    _attempt(provider, kind, vision, kwargs),
+                    _attempt(backup, kind, vision, kwargs),
+                    provider.hedge_delay(kind),
+                    provider
+                )
+            return await _attempt(provider, kind, vision, kwargs)
+        except APIError as e:
+            error = e
+            if i + 1 < len(providers):
+                LLM_EVENTS.inc(provider=provider.name, event="failover")
+                logger.warning(f"LLM {kind} call to {provider.name} failed ({e.__class__.__name__}), failing over to {providers[i + 1].name}")
+    raise error
+
+
+# yields (chunk, model); fails over only until the first chunk has been received
+async def stream_chat_completion(kind: str, **kwargs):
+    from openai import APIError
+
+    providers = get_providers()
+    error = None
+    for i, provider in enumerate(providers):
+        try:
+            stream = await _with_retries(
+                provider, kind,
+                lambda: provider.client.chat.completions.create(model=provider.model, stream=True, **kwargs)
+            )
+            iterator = stream.__aiter__()
+            first = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        except APIError as e:
+            error = e
+            if i + 1 < len(providers):
+                LLM_EVENTS.inc(provider=provider.name, event="failover")
+                logger.warning(f"LLM {kind} stream from {provider.name} failed ({e.__class__.__name__}), failing over to {providers[i + 1].name}")
+            continue
+
+        yield first, provider.model
+        async for chunk in iterator:
+            yield chunk, provider.model
+        return
+    raise error
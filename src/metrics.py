@@ -0,0 +1,148 @@
+import os
+import time
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager, nullcontext
+
+# emit OpenTelemetry spans for each stage; needs opentelemetry-api and a configured SDK/exporter
+OTEL_TRACING = os.getenv("OTEL_TRACING", "false").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB .. 64 MiB
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: tuple) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple((name, labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._samples(key, value))
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self, key: tuple, value: float) -> list[str]:
+        return [f"{self.name}_total{_labels(key)} {value}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            # counts[-1] is the +Inf bucket, i.e. the number of observations
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self, key: tuple, value: tuple) -> list[str]:
+        counts, total = value
+        bounds = [*self.buckets, "+Inf"]
+        lines = [f"{self.name}_bucket{_labels(key + (('le', bound),))} {count}" for bound, count in zip(bounds, counts)]
+        lines.append(f"{self.name}_sum{_labels(key)} {total}")
+        lines.append(f"{self.name}_count{_labels(key)} {counts[-1]}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time until the response headers are sent", ("method", "route", "status")
+)
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Time spent in each processing stage", ("stage",))
+LLM_TOKENS = Counter("llm_tokens", "Tokens reported by the model API", ("kind", "model", "type"))
+PAYLOAD_BYTES = Histogram("payload_size_bytes", "Size of uploaded and generated files", ("kind",), buckets=SIZE_BUCKETS)
+CACHE_REQUESTS = Counter("cache_requests", "Cache lookups by outcome", ("cache", "result"))
+LLM_EVENTS = Counter("llm_events", "Model call retries, hedged requests and failovers", ("provider", "event"))
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+@functools.lru_cache(maxsize=None)
+def _tracer():
+    if not OTEL_TRACING:
+        return None
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer("resume-tailor")
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    tracer = _tracer()
+    span = tracer.start_as_current_span(name, attributes=attributes) if tracer else nullcontext()
+    start = time.perf_counter()
+    try:
+        with span:
+            yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+def timed(name: str):
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_usage(kind: str, model: str, usage) -> None:
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, kind=kind, model=model, type="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens or 0, kind=kind, model=model, type="completion")
@@ -0,0 +1,65 @@
+import os
+import io
+import base64
+import asyncio
+
+from src.workers import document_pool
+
+PDF_RENDER_SCALE = float(os.getenv("PDF_RENDER_SCALE", "2"))
+PDF_IMAGE_FORMAT = os.getenv("PDF_IMAGE_FORMAT", "PNG").upper()
+PDF_IMAGE_QUALITY = int(os.getenv("PDF_IMAGE_QUALITY", "85"))
+
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+# checked when pages are rendered and by /ready, so a bad setting doesn't stop the import
+def check_image_format() -> str:
+    if PDF_IMAGE_FORMAT not in MIME_TYPES:
+        raise ValueError(f"PDF_IMAGE_FORMAT must be one of {', '.join(MIME_TYPES)}")
+    return PDF_IMAGE_FORMAT
+
+
+def page_count(file_bytes: bytes) -> int:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def render_page(file_bytes: bytes, index: int, scale: float, image_format: str, quality: int) -> str:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        bitmap = pdf[index].render(scale=scale)
+        pil_image = bitmap.to_pil()
+    finally:
+        pdf.close()
+
+    buffer = io.BytesIO()
+    if image_format == "PNG":
+        pil_image.save(buffer, format="PNG")
+    else:
+        pil_image.convert("RGB").save(buffer, format=image_format, quality=quality)
+
+    base64_image = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return f"data:{MIME_TYPES[image_format]};base64,{base64_image}"
+
+
+async def render_pdf_pages(file_bytes: bytes, pages: list[int] | None = None) -> list[str]:
+    image_format = check_image_format()
+    if pages is None:
+        pages = range(await document_pool.run("pdf_page_count", file_bytes))
+
+    # each page is rendered and encoded independently, so encoding one page
+    # overlaps with rendering the next
+    return await asyncio.gather(*(
+        document_pool.run(
+            "pdf_render_page", file_bytes, index,
+            PDF_RENDER_SCALE, image_format, PDF_IMAGE_QUALITY
+        )
+        for index in pages
+    ))
@@ -0,0 +1,60 @@
+import os
+import unicodedata
+
+PDF_TEXT_MIN_CHARS = int(os.getenv("PDF_TEXT_MIN_CHARS", "80"))
+PDF_TEXT_MIN_SCORE = float(os.getenv("PDF_TEXT_MIN_SCORE", "0.6"))
+
+
+def extract_page_texts(file_bytes: bytes) -> list[str]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_bytes)
+    texts = []
+    try:
+        for page in pdf:
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            texts.append(text.replace("\r\n", "\n").replace("\r", "\n").strip())
+    finally:
+        pdf.close()
+    return texts
+
+
+def score_page_text(text: str) -> float:
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < PDF_TEXT_MIN_CHARS:
+        return 0.0
+
+    # glyph sanity: unmapped glyphs show up as replacement, private use or control chars
+    bad = sum(1 for c in chars if c == "\ufffd" or unicodedata.category(c) in ("Co", "Cc", "Cn"))
+    glyph_score = 1 - bad / len(chars)
+
+    alnum_score = min(1.0, sum(1 for c in chars if c.isalnum()) / len(chars) / 0.7)
+
+    # layout: broken text layers either lose word spacing or space out every letter
+    words = text.split()
+    avg_word = len(chars) / len(words)
+    if avg_word < 2:
+        layout_score = avg_word / 2
+    elif avg_word > 12:
+        layout_score = 12 / avg_word
+    else:
+        layout_score = 1.0
+
+    return glyph_score * alnum_score * layout_score
+
+
+def needs_vision(text: str) -> bool:
+    return score_page_text(text) < PDF_TEXT_MIN_SCORE
+
+
+def contiguous_runs(indices: list[int]) -> list[list[int]]:
+    runs = []
+    for index in indices:
+        if runs and runs[-1][-1] == index - 1:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+    return runs
@@ -0,0 +1,31 @@
+from src.prompts.resume_tailor import SYSTEM_PROMPT
+from src.prompts.cover_letter import COVER_LETTER_SYSTEM_PROMPT
+
+COMBINED_SYSTEM_PROMPT = f"""You produce TWO documents for the same candidate and job in a single response: a tailored resume and a cover letter.
+Follow the resume rules in PART 1 and the cover letter rules in PART 2. The resume and cover letter must be consistent with each other (same name, same facts, same metrics).
+
+# PART 1: TAILORED RESUME
+
+{SYSTEM_PROMPT}
+
+# PART 2: COVER LETTER
+
+{COVER_LETTER_SYSTEM_PROMPT}
+
+## COMBINED OUTPUT (CRITICAL)
+Return ONE JSON object with exactly two fields:
+- "resume": the resume JSON object exactly as described in PART 1 "Output Format"
+- "cover_letter": the cover letter JSON object with "name" and "content" exactly as described in PART 2 "OUTPUT"
+"""
+
+
+COMBINED_USER_TEMPLATE = """Here is the candidate's resume:
+{resume_text}
+
+Here is the target job description:
+{job_description}
+
+Instructions:
+1. Build the tailored resume following PART 1 (extract ALL contact information, use EXACT JD keywords, quantify achievements, sort work_experience newest FIRST)
+2. Write the cover letter following PART 2 (250-300 words, natural tone, no em dashes, ending with "Yours sincerely," and the candidate's full name)
+3. Return valid JSON only, in the form {{"resume": {{...}}, "cover_letter": {{"name": "...", "content": "..."}}}}"""
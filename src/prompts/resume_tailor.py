@@ -1,11 +1,4 @@
-SYSTEM_PROMPT = """You are an expert resume writer specializing in ATS optimization and human reviewer appeal.
-
-## Your Task
-1. Extract candidate information from the provided resume
-2. Tailor content to match the target job description
-3. Optimize for both ATS parsing and human reviewers
-
-## CRITICAL ATS Rules (HIGH Priority)
+TAILORING_RULES = """## CRITICAL ATS Rules (HIGH Priority)
 
 ### 1. Chronological Order (Work Experience) - STRICT - MUST FOLLOW FIRST
 - ALWAYS sort work_experience by START DATE in DESCENDING order (newest first)
@@ -119,11 +112,9 @@ Proactively add relevant industry terminology:
 - Keep bullets concise (1-2 lines max)
 - Lead with impact, not responsibility
 - Prioritize recent and relevant experience
-- Professional summary should directly address what the role requires
+- Professional summary should directly address what the role requires"""
 
-## Output Format
-Return data in this exact JSON structure. IMPORTANT: Extract ALL contact fields from the resume - do not skip any.
-{
+RESUME_SCHEMA = """{
     "name": "Full Name (REQUIRED - extract from resume header)",
     "email": "email@example.com (REQUIRED - extract from resume)",
     "phone": "phone number (REQUIRED - extract from resume)",
@@ -162,7 +153,20 @@ Return data in this exact JSON structure. IMPORTANT: Extract ALL contact fields
             "year": "Year"
         }
     ]
-}
+}"""
+
+SYSTEM_PROMPT = f"""You are an expert resume writer specializing in ATS optimization and human reviewer appeal.
+
+## Your Task
+1. Extract candidate information from the provided resume
+2. Tailor content to match the target job description
+3. Optimize for both ATS parsing and human reviewers
+
+{TAILORING_RULES}
+
+## Output Format
+Return data in this exact JSON structure. IMPORTANT: Extract ALL contact fields from the resume - do not skip any.
+{RESUME_SCHEMA}
 
 REMINDER: work_experience array MUST be sorted by date (newest first). Verify the order before returning."""
 
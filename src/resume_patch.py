@@ -0,0 +1,44 @@
+import copy
+
+# patched per entry: {"index": i, ...changed keys}
+ENTRY_FIELDS = ("work_experience", "projects")
+
+
+def _is_entry_patch(value) -> bool:
+    return isinstance(value, list) and all(isinstance(entry, dict) and isinstance(entry.get("index"), int) for entry in value)
+
+
+def apply_patch(resume_data: dict, patch: dict) -> dict:
+    merged = copy.deepcopy(resume_data)
+    for key, value in patch.items():
+        if key in ENTRY_FIELDS and _is_entry_patch(value):
+            entries = merged.get(key) or []
+            for change in value:
+                index = change["index"]
+                if 0 <= index < len(entries):
+                    entries[index].update({k: v for k, v in change.items() if k != "index"})
+        else:
+            # plain fields, and entry lists the model returned in full
+            merged[key] = value
+    return merged
+
+
+def diff_resume_data(before, after, path: str = "") -> list[dict]:
+    if before == after:
+        return []
+
+    if isinstance(before, dict) and isinstance(after, dict):
+        changes = []
+        for key in [*before, *(key for key in after if key not in before)]:
+            changes += diff_resume_data(before.get(key), after.get(key), f"{path}.{key}" if path else key)
+        return changes
+
+    # entries are compared by position; lists of strings are compared whole
+    if (isinstance(before, list) and isinstance(after, list) and len(before) == len(after)
+            and all(isinstance(item, dict) for item in before + after)):
+        changes = []
+        for index, (old, new) in enumerate(zip(before, after)):
+            changes += diff_resume_data(old, new, f"{path}[{index}]")
+        return changes
+
+    return [{"field": path, "before": before, "after": after}]
@@ -1,54 +1,61 @@
 import os
 import json
-import base64
-import io
-import tempfile
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from openai import OpenAI
-from dotenv import load_dotenv
-import pypdfium2 as pdfium
-
+import asyncio
+import logging
+
+from src.admission import admission, estimate_tokens, LLM_COMPLETION_TOKEN_ESTIMATE
+from src.llm import chat_completion as provider_chat_completion, stream_chat_completion
+from src.metrics import stage, timed, record_usage
+from src.pdf_render import render_pdf_pages
+from src.pdf_text import needs_vision, contiguous_runs
 from src.prompts.resume_tailor import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
 from src.prompts.cover_letter import COVER_LETTER_SYSTEM_PROMPT, COVER_LETTER_USER_TEMPLATE
-
-load_dotenv(override=True)
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-AI_MODEL = os.getenv("AI_MODEL", "gpt-4o-mini")
-VISION_MODEL = os.getenv("VISION_MODEL", "gpt-4o-mini")
-
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY is not set. Add it to your .env file.")
-
-
-def extract_pdf_with_vision(file_bytes: bytes) -> str:
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        tmp.write(file_bytes)
-        tmp_path = tmp.name
-
-    try:
-        pdf = pdfium.PdfDocument(tmp_path)
-        image_contents = []
-
-        for page in pdf:
-            bitmap = page.render(scale=2)
-            pil_image = bitmap.to_pil()
-            buffer = io.BytesIO()
-            pil_image.save(buffer, format="PNG")
-            base64_image = base64.b64encode(buffer.getvalue()).decode("utf-8")
-            image_contents.append({
-                "type": "image_url",
-                "image_url": {"url": f"data:image/png;base64,{base64_image}"}
-            })
-        pdf.close()
-    finally:
-        os.unlink(tmp_path)
-
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.chat.completions.create(
-        model=VISION_MODEL,
+from src.prompts.combined import COMBINED_SYSTEM_PROMPT, COMBINED_USER_TEMPLATE
+from src.prompts.resume_extract import EXTRACT_SYSTEM_PROMPT, EXTRACT_USER_TEMPLATE
+from src.prompts.resume_patch import PATCH_SYSTEM_PROMPT, PATCH_USER_TEMPLATE
+from src.workers import document_pool
+
+logger = logging.getLogger(__name__)
+
+# "single" asks for resume and cover letter in one completion, "concurrent" runs both prompts in parallel
+COMBINED_GENERATION = os.getenv("COMBINED_GENERATION", "single")
+# "incremental" extracts each upload into structured JSON once and asks only for the changed fields per job
+# description, "single" extracts and tailors the raw text in one completion every time
+TAILOR_GENERATION = os.getenv("TAILOR_GENERATION", "incremental")
+
+# prompts per generation kind; any edit changes the memoized result cache key
+PROMPTS = {
+    "tailor": (SYSTEM_PROMPT, USER_PROMPT_TEMPLATE),
+    "cover_letter": (COVER_LETTER_SYSTEM_PROMPT, COVER_LETTER_USER_TEMPLATE),
+    "combined": (COMBINED_SYSTEM_PROMPT, COMBINED_USER_TEMPLATE),
+    "extract": (EXTRACT_SYSTEM_PROMPT, EXTRACT_USER_TEMPLATE),
+    "tailor_patch": (PATCH_SYSTEM_PROMPT, PATCH_USER_TEMPLATE),
+}
+
+# bump when read_resume output changes so cached extractions are redone
+EXTRACTOR_VERSION = "3"
+
+
+async def chat_completion(kind: str, vision: bool = False, **kwargs):
+    tokens = estimate_tokens(kwargs["messages"], kwargs.get("max_tokens", LLM_COMPLETION_TOKEN_ESTIMATE))
+    async with admission.slot(tokens):
+        with stage(f"llm_{kind}"):
+            response, model = await provider_chat_completion(kind, vision, **kwargs)
+    record_usage(kind, model, response.usage)
+    return response
+
+
+async def extract_pdf_with_vision(file_bytes: bytes, pages: list[int] | None = None) -> str:
+    with stage("pdf_render"):
+        image_urls = await render_pdf_pages(file_bytes, pages)
+    image_contents = [
+        {"type": "image_url", "image_url": {"url": image_url}}
+        for image_url in image_urls
+    ]
+
+    response = await chat_completion(
+        "vision",
+        vision=True,
         messages=[{
             "role": "user",
             "content": [
@@ -62,33 +69,61 @@ def extract_pdf_with_vision(file_bytes: bytes) -> str:
     return response.choices[0].message.content.strip()
 
 
-def read_resume(file_bytes: bytes, filename: str) -> str:
+async def extract_pdf(file_bytes: bytes) -> str:
+    with stage("pdf_text"):
+        page_texts = await document_pool.run("pdf_text", file_bytes)
+
+    # only pages without a usable text layer (scans, outlined fonts) go to the vision model
+    runs = contiguous_runs([i for i, text in enumerate(page_texts) if needs_vision(text)])
+    if runs:
+        vision_texts = await asyncio.gather(*(extract_pdf_with_vision(file_bytes, run) for run in runs))
+        for run, text in zip(runs, vision_texts):
+            page_texts[run[0]] = text
+            for index in run[1:]:
+                page_texts[index] = ""
+
+    return "\n\n".join(text for text in page_texts if text)
+
+
+@timed("read_resume")
+async def read_resume(file_bytes: bytes, filename: str) -> str:
     if filename.endswith('.pdf'):
-        return extract_pdf_with_vision(file_bytes)
+        return await extract_pdf(file_bytes)
 
     elif filename.endswith('.docx'):
-        doc = Document(io.BytesIO(file_bytes))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        return await document_pool.run("docx_text", file_bytes)
 
     else:
         raise ValueError("File must be .pdf or .docx")
 
 
-def call_openai(resume_text: str, job_description: str) -> dict:
-    client = OpenAI(api_key=OPENAI_API_KEY)
+def tailor_messages(resume_text: str, job_description: str) -> list[dict]:
     user_prompt = USER_PROMPT_TEMPLATE.format(
         resume_text=resume_text,
         job_description=job_description
     )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+async def call_openai(resume_text: str, job_description: str) -> dict:
+    response = await chat_completion(
+        "tailor",
+        messages=tailor_messages(resume_text, job_description),
+        response_format={"type": "json_object"}
+    )
+
+    return json.loads(response.choices[0].message.content)
 
-    response = client.chat.completions.create(
-        model=AI_MODEL,
+
+async def call_openai_extract(resume_text: str) -> dict:
+    response = await chat_completion(
+        "extract",
         messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
+            {"role": "system", "content": EXTRACT_SYSTEM_PROMPT},
+            {"role": "user", "content": EXTRACT_USER_TEMPLATE.format(resume_text=resume_text)}
         ],
         response_format={"type": "json_object"}
     )
@@ -96,15 +131,61 @@ def call_openai(resume_text: str, job_description: str) -> dict:
     return json.loads(response.choices[0].message.content)
 
 
-def call_openai_cover_letter(resume_text: str, job_description: str) -> dict:
-    client = OpenAI(api_key=OPENAI_API_KEY)
+def patch_messages(resume_json: str, job_description: str) -> list[dict]:
+    user_prompt = PATCH_USER_TEMPLATE.format(
+        resume_json=resume_json,
+        job_description=job_description
+    )
+    return [
+        {"role": "system", "content": PATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+# returns only the fields that change; see resume_patch.apply_patch
+async def call_openai_patch(resume_json: str, job_description: str) -> dict:
+    response = await chat_completion(
+        "tailor_patch",
+        messages=patch_messages(resume_json, job_description),
+        response_format={"type": "json_object"}
+    )
+
+    return json.loads(response.choices[0].message.content)
+
+
+async def stream_json_completion(kind: str, messages: list[dict]):
+    async with admission.slot(estimate_tokens(messages)):
+        with stage(f"llm_{kind}"):
+            stream = stream_chat_completion(
+                kind,
+                messages=messages,
+                response_format={"type": "json_object"},
+                stream_options={"include_usage": True}
+            )
+
+            async for chunk, model in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                # the final chunk carries usage and no choices
+                record_usage(kind, model, getattr(chunk, "usage", None))
+
+
+def stream_openai(resume_text: str, job_description: str):
+    return stream_json_completion("tailor_stream", tailor_messages(resume_text, job_description))
+
+
+def stream_openai_patch(resume_json: str, job_description: str):
+    return stream_json_completion("tailor_patch_stream", patch_messages(resume_json, job_description))
+
+
+async def call_openai_cover_letter(resume_text: str, job_description: str) -> dict:
     user_prompt = COVER_LETTER_USER_TEMPLATE.format(
         resume_text=resume_text,
         job_description=job_description
     )
 
-    response = client.chat.completions.create(
-        model=AI_MODEL,
+    response = await chat_completion(
+        "cover_letter",
         messages=[
             {"role": "system", "content": COVER_LETTER_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
@@ -115,136 +196,41 @@ def call_openai_cover_letter(resume_text: str, job_description: str) -> dict:
     return json.loads(response.choices[0].message.content)
 
 
-def create_cover_letter_docx(text: str) -> bytes:
-    doc = Document()
-
-    for section in doc.sections:
-        section.top_margin = Inches(1)
-        section.bottom_margin = Inches(1)
-        section.left_margin = Inches(1)
-        section.right_margin = Inches(1)
-
-    for paragraph in text.strip().split('\n\n'):
-        if paragraph.strip():
-            p = doc.add_paragraph(paragraph.strip())
-            p.paragraph_format.space_after = Pt(12)
-
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    return buffer.getvalue()
-
-
-def create_docx(resume_data: dict) -> bytes:
-    doc = Document()
-
-    for section in doc.sections:
-        section.top_margin = Inches(0.5)
-        section.bottom_margin = Inches(0.5)
-        section.left_margin = Inches(0.5)
-        section.right_margin = Inches(0.5)
-
-    def add_section_heading(text):
-        heading = doc.add_paragraph()
-        heading_run = heading.add_run(text.upper())
-        heading_run.bold = True
-        heading_run.font.size = Pt(11)
-        heading_run.font.color.rgb = RGBColor(0, 51, 102)
-        heading.space_before = Pt(10)
-        heading.space_after = Pt(2)
-
-    # header
-    name = doc.add_paragraph()
-    name_run = name.add_run(resume_data['name'])
-    name_run.bold = True
-    name_run.font.size = Pt(20)
-    name_run.font.color.rgb = RGBColor(0, 0, 0)
-    name.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    name.space_after = Pt(4)
-
-    contact_parts = []
-    for field in ['email', 'phone', 'location', 'github', 'linkedin', 'portfolio']:
-        value = resume_data.get(field, '').strip()
-        if value:
-            contact_parts.append(value)
-
-    contact = doc.add_paragraph()
-    contact_run = contact.add_run(' | '.join(contact_parts))
-    contact_run.font.size = Pt(10)
-    contact_run.font.color.rgb = RGBColor(64, 64, 64)
-    contact.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    contact.space_after = Pt(10)
-
-    # professional summary
-    if resume_data.get('professional_summary'):
-        add_section_heading('Professional Summary')
-        summary = doc.add_paragraph(resume_data['professional_summary'])
-        summary.space_after = Pt(8)
-
-    # professional experience
-    add_section_heading('Professional Experience')
-    for job in resume_data.get('work_experience', []):
-        title_para = doc.add_paragraph()
-        title_run = title_para.add_run(job['title'])
-        title_run.bold = True
-        title_run.font.size = Pt(11)
-        title_para.space_after = Pt(2)
-
-        company_para = doc.add_paragraph()
-        company_run = company_para.add_run(f"{job['company']} | ")
-        company_run.font.size = Pt(10)
-        duration_run = company_para.add_run(job['duration'])
-        duration_run.italic = True
-        duration_run.font.size = Pt(10)
-        duration_run.font.color.rgb = RGBColor(64, 64, 64)
-        company_para.space_after = Pt(4)
-
-        for bullet in job['bullets']:
-            bullet_para = doc.add_paragraph(bullet, style='List Bullet')
-            bullet_para.space_after = Pt(2)
-
-        doc.add_paragraph().space_after = Pt(6)
-
-    # key projects
-    if resume_data.get('projects'):
-        add_section_heading('Key Projects')
-        for project in resume_data['projects']:
-            project_para = doc.add_paragraph()
-            name_run = project_para.add_run(project['name'])
-            name_run.bold = True
-            name_run.font.size = Pt(10.5)
-            project_para.space_after = Pt(2)
-
-            for bullet in project['bullets']:
-                bullet_para = doc.add_paragraph(bullet, style='List Bullet')
-                bullet_para.space_after = Pt(2)
-
-            doc.add_paragraph().space_after = Pt(4)
-
-    # technical skills
-    if resume_data.get('skills'):
-        add_section_heading('Technical Skills')
-        skills_text = ' | '.join(resume_data['skills'])
-        skills = doc.add_paragraph(skills_text)
-        skills.space_after = Pt(8)
-
-    # core competencies
-    if resume_data.get('soft_skills'):
-        add_section_heading('Core Competencies')
-        soft_skills_text = ' | '.join(resume_data['soft_skills'])
-        competencies = doc.add_paragraph(soft_skills_text)
-        competencies.space_after = Pt(8)
-
-    # education
-    if resume_data.get('education'):
-        add_section_heading('Education')
-        for edu in resume_data['education']:
-            edu_para = doc.add_paragraph()
-            degree_run = edu_para.add_run(edu['degree'])
-            degree_run.bold = True
-            degree_run.font.size = Pt(10.5)
-            edu_para.add_run(f" - {edu['institution']}, {edu['year']}")
-            edu_para.space_after = Pt(4)
-
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    return buffer.getvalue()
+async def call_openai_combined(resume_text: str, job_description: str) -> tuple[dict, dict]:
+    if COMBINED_GENERATION == "single":
+        user_prompt = COMBINED_USER_TEMPLATE.format(
+            resume_text=resume_text,
+            job_description=job_description
+        )
+
+        response = await chat_completion(
+            "combined",
+            messages=[
+                {"role": "system", "content": COMBINED_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+
+        data = json.loads(response.choices[0].message.content)
+        resume_data = data.get("resume")
+        cover_letter_data = data.get("cover_letter")
+        if isinstance(resume_data, dict) and resume_data.get("name") and isinstance(cover_letter_data, dict) and cover_letter_data.get("content"):
+            return resume_data, cover_letter_data
+        logger.warning("Combined completion was incomplete, generating resume and cover letter separately")
+
+    resume_data, cover_letter_data = await asyncio.gather(
+        call_openai(resume_text, job_description),
+        call_openai_cover_letter(resume_text, job_description)
+    )
+    return resume_data, cover_letter_data
+
+
+@timed("create_cover_letter_docx")
+async def create_cover_letter_docx(text: str) -> bytes:
+    return await document_pool.run("render_cover_letter", text)
+
+
+@timed("create_docx")
+async def create_docx(resume_data: dict) -> bytes:
+    return await document_pool.run("render_resume", resume_data)
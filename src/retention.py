@@ -0,0 +1,77 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from src.blobstore import get_blob_store
+from src.database import prune_resumes, unreferenced_blobs
+from src.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# resumes (with their jobs, batches and generated files) older than this are deleted; 0 keeps everything
+RESUME_RETENTION_DAYS = float(os.getenv("RESUME_RETENTION_DAYS", "30"))
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "3600"))
+# resumes deleted per transaction, so pruning never holds long locks
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "200"))
+
+RETENTION_DELETED = Counter("retention_deleted", "Resumes and blobs removed by retention pruning", ("kind",))
+
+
+# deletes the blobs among `keys` that no row refers to any more; an identical file
+# uploaded between the check and the delete loses its blob, and uploading it again
+# restores it (uploads always put the blob, also when they match an existing resume)
+def release_blobs(keys: set[str]) -> int:
+    store = get_blob_store()
+    released = unreferenced_blobs(keys)
+    for key in released:
+        store.delete(key)
+    RETENTION_DELETED.inc(len(released), kind="blob")
+    return len(released)
+
+
+def prune_batch(cutoff: datetime, limit: int = RETENTION_BATCH_SIZE) -> int:
+    count, keys = prune_resumes(cutoff, limit)
+    RETENTION_DELETED.inc(count, kind="resume")
+    release_blobs(keys)
+    return count
+
+
+class RetentionJob:
+    def __init__(self, days: float = RESUME_RETENTION_DAYS, interval: float = RETENTION_INTERVAL):
+        self.days = days
+        self.interval = interval
+        self._task = None
+
+    async def start(self) -> None:
+        if self.days > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # one batch per thread hop, so requests keep getting database connections in between
+    async def prune(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(days=self.days)
+        total = 0
+        while True:
+            count = await asyncio.to_thread(prune_batch, cutoff)
+            total += count
+            if count < RETENTION_BATCH_SIZE:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await self.prune()
+                if deleted:
+                    logger.info(f"Retention pruned {deleted} resumes older than {self.days:g} days")
+            except Exception:
+                logger.exception("Retention pruning failed")
+            await asyncio.sleep(self.interval)
+
+
+retention_job = RetentionJob()
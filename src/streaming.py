@@ -0,0 +1,180 @@
+import json
+
+from src.resume_patch import apply_patch, ENTRY_FIELDS
+
+# top-level fields that make up the resume header, in schema order
+HEADER_FIELDS = ("name", "email", "phone", "github", "linkedin", "location", "portfolio")
+
+# list sections whose entries are emitted one by one as they complete
+ITEM_SECTIONS = ("work_experience", "projects", "education")
+
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# scans a streamed resume JSON object and reports each top-level section
+# (and each entry of ITEM_SECTIONS) as soon as it is complete
+class SectionParser:
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+        self._item_index = 0
+        self._header = {}
+        self._header_sent = False
+
+    def feed(self, chunk: str) -> list[tuple[str, dict]]:
+        self.text += chunk
+        events = []
+        text = self.text
+
+        while self._pos < len(text):
+            ch = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:self._pos + 1])
+                        self._key_start = None
+
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = self._pos
+
+            elif ch == ":" and self._depth == 1:
+                self._value_start = self._pos + 1
+
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 2 and ch == "[" and self._key in ITEM_SECTIONS:
+                    self._item_start = self._pos + 1
+                    self._item_index = 0
+
+            elif ch in "}]":
+                if self._depth == 2 and self._item_start is not None:
+                    self._end_item(events)
+                    self._item_start = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end_value(events)
+                    self._flush_header(events)
+
+            elif ch == ",":
+                if self._depth == 1:
+                    self._end_value(events)
+                elif self._depth == 2 and self._item_start is not None:
+                    self._end_item(events)
+                    self._item_start = self._pos + 1
+
+            self._pos += 1
+
+        return events
+
+    def result(self) -> dict:
+        return json.loads(self.text)
+
+    def _end_value(self, events: list) -> None:
+        if self._value_start is None:
+            return
+
+        raw = self.text[self._value_start:self._pos].strip()
+        key = self._key
+        self._value_start = None
+        self._key = None
+        if not raw:
+            return
+
+        value = json.loads(raw)
+        if key in HEADER_FIELDS and not self._header_sent:
+            self._header[key] = value
+            return
+
+        self._flush_header(events)
+        if key not in ITEM_SECTIONS:
+            events.append(("section", {"section": key, "data": value}))
+
+    def _end_item(self, events: list) -> None:
+        raw = self.text[self._item_start:self._pos].strip()
+        if not raw:
+            return
+
+        self._flush_header(events)
+        events.append(("item", {"section": self._key, "index": self._item_index, "data": json.loads(raw)}))
+        self._item_index += 1
+
+    def _flush_header(self, events: list) -> None:
+        if not self._header_sent and self._header:
+            events.append(("section", {"section": "header", "data": self._header}))
+            self._header_sent = True
+
+
+# runs a streamed patch (see resume_patch) through SectionParser and reports each patched
+# section and entry, merged into the extracted resume, as soon as it is complete;
+# rest() then reports the sections and entries the patch left alone
+class PatchSectionParser:
+    def __init__(self, resume_data: dict):
+        self.resume_data = resume_data
+        self._parser = SectionParser()
+        self._sent_sections = set()
+        self._sent_items = set()
+
+    def feed(self, chunk: str) -> list[tuple[str, dict]]:
+        events = []
+        for event, data in self._parser.feed(chunk):
+            section = data["section"]
+            if event == "section":
+                if section == "header":
+                    header = {key: self.resume_data[key] for key in HEADER_FIELDS if key in self.resume_data}
+                    data = {"section": section, "data": {**header, **data["data"]}}
+                self._sent_sections.add(section)
+                events.append((event, data))
+                continue
+
+            change = data["data"]
+            index = data["index"]
+            entries = self.resume_data.get(section) or []
+            if section in ENTRY_FIELDS and isinstance(change, dict) and isinstance(change.get("index"), int):
+                index = change["index"]
+                if not 0 <= index < len(entries):
+                    continue
+                change = {**entries[index], **{key: value for key, value in change.items() if key != "index"}}
+            self._sent_items.add((section, index))
+            events.append(("item", {"section": section, "index": index, "data": change}))
+        return events
+
+    def patch(self) -> dict:
+        return self._parser.result()
+
+    def result(self) -> dict:
+        return apply_patch(self.resume_data, self.patch())
+
+    def rest(self) -> list[tuple[str, dict]]:
+        merged = self.result()
+        events = []
+        header = {key: merged[key] for key in HEADER_FIELDS if key in merged}
+        if header and "header" not in self._sent_sections:
+            events.append(("section", {"section": "header", "data": header}))
+        for key, value in merged.items():
+            if key in HEADER_FIELDS:
+                continue
+            if key in ITEM_SECTIONS and isinstance(value, list):
+                events += [
+                    ("item", {"section": key, "index": index, "data": entry})
+                    for index, entry in enumerate(value) if (key, index) not in self._sent_items
+                ]
+            elif key not in self._sent_sections:
+                events.append(("section", {"section": key, "data": value}))
+        return events
@@ -0,0 +1,174 @@
+import os
+import hashlib
+import zipfile
+import tempfile
+
+from fastapi import HTTPException, Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# uploads larger than this are spooled to a temporary file instead of memory
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+# room for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD = 16 * 1024
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+# readers accept a PDF header anywhere in the first 1024 bytes
+SNIFF_BYTES = 1024
+
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
+
+
+def sniff_extension(head: bytes) -> str | None:
+    if head.startswith(ZIP_MAGIC):
+        return ".docx"
+    if PDF_MAGIC in head[:SNIFF_BYTES]:
+        return ".pdf"
+    return None
+
+
+class Upload:
+    def __init__(self, filename: str, file, file_hash: str, size: int):
+        self.filename = filename
+        self.file = file
+        self.file_hash = file_hash
+        self.size = size
+
+
+class _FileReceiver:
+    def __init__(self, field: str, max_bytes: int):
+        self.field = field
+        self.max_bytes = max_bytes
+        self.filename = None
+        self.file = None
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.head = b""
+        self.receiving = False
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = params.get(b"name", b"").decode("utf-8", "replace")
+        if name != self.field or self.file is not None:
+            return
+
+        filename = os.path.basename(params.get(b"filename", b"").decode("utf-8", "replace").replace("\\", "/"))
+        if not filename.endswith(('.pdf', '.docx')):
+            raise HTTPException(400, "File must be .pdf or .docx")
+        self.filename = filename
+        self.file = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        self.receiving = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self.receiving:
+            return
+        chunk = data[start:end]
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise HTTPException(413, f"File is larger than {self.max_bytes} bytes")
+
+        # reject content that is not what the extension claims before reading the rest
+        if len(self.head) < SNIFF_BYTES:
+            self.head += chunk[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self.check_type()
+
+        self.hasher.update(chunk)
+        self.file.write(chunk)
+
+    def on_part_end(self) -> None:
+        if self.receiving:
+            self.receiving = False
+            if len(self.head) < SNIFF_BYTES:
+                self.check_type()
+
+    def check_type(self) -> None:
+        if sniff_extension(self.head) != os.path.splitext(self.filename)[1]:
+            raise HTTPException(415, "File content is not a PDF or DOCX document")
+
+
+# reads a multipart upload chunk by chunk, hashing and size-checking the file
+# as it arrives, so the body is never held in memory as a whole
+async def receive_upload(request: Request, field: str = "file", max_bytes: int = MAX_UPLOAD_BYTES) -> Upload:
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(400, "Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(413, f"File is larger than {max_bytes} bytes")
+
+    receiver = _FileReceiver(field, max_bytes)
+    parser = MultipartParser(params[b"boundary"], receiver.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except BaseException:
+        if receiver.file is not None:
+            receiver.file.close()
+        raise
+
+    if receiver.file is None or receiver.receiving:
+        raise HTTPException(400, f"Missing '{field}' file in upload")
+
+    receiver.file.seek(0)
+    if receiver.filename.endswith('.docx'):
+        # a zip signature alone could be any archive
+        try:
+            with zipfile.ZipFile(receiver.file) as package:
+                is_docx = "word/document.xml" in package.namelist()
+        except zipfile.BadZipFile:
+            is_docx = False
+        if not is_docx:
+            receiver.file.close()
+            raise HTTPException(415, "File content is not a PDF or DOCX document")
+        receiver.file.seek(0)
+
+    return Upload(receiver.filename, receiver.file, receiver.hasher.hexdigest(), receiver.size)
@@ -0,0 +1,112 @@
+import os
+import time
+import asyncio
+import logging
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# processes for CPU-bound document work (DOCX parsing and rendering, PDF text and page rendering);
+# 0 runs it on threads in the serving process
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", os.getenv("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1)))))
+# tasks submitted beyond one per worker; further callers wait for a slot
+DOCUMENT_QUEUE_SIZE = int(os.getenv("DOCUMENT_QUEUE_SIZE", str(max(1, DOCUMENT_WORKERS) * 2)))
+
+DOCUMENT_POOL_WAIT_SECONDS = Histogram("document_pool_wait_seconds", "Time document tasks waited for a pool slot")
+
+
+# tasks take and return plain data (bytes, str, dicts of str) so nothing expensive is pickled
+def _tasks() -> dict:
+    from src.docx_render import render_resume, render_cover_letter
+    from src.docx_text import extract_docx_text
+    from src.pdf_render import page_count, render_page
+    from src.pdf_text import extract_page_texts
+
+    return {
+        "render_resume": render_resume,
+        "render_cover_letter": render_cover_letter,
+        "docx_text": extract_docx_text,
+        "pdf_page_count": page_count,
+        "pdf_render_page": render_page,
+        "pdf_text": extract_page_texts,
+    }
+
+
+def _warm() -> None:
+    from src.docx_render import get_template
+
+    for module in ("pypdfium2", "PIL.Image"):
+        importlib.import_module(module)
+
+    get_template()
+
+
+def _execute(task: str, *args):
+    return _tasks()[task](*args)
+
+
+class DocumentPool:
+    def __init__(self, workers: int = DOCUMENT_WORKERS, queue_size: int = DOCUMENT_QUEUE_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = None
+        self._loop = None
+        self._semaphore = None
+
+    def _get_executor(self) -> ProcessPoolExecutor | None:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm
+            )
+        return self._executor
+
+    def _slots(self) -> asyncio.Semaphore:
+        # the app runs on one loop, but benchmarks call asyncio.run repeatedly
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(max(1, self.workers) + self.queue_size)
+        return self._semaphore
+
+    # spawns every worker (which imports pypdfium2 and Pillow and loads the DOCX
+    # template) before the first request needs one
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if executor is None:
+            await asyncio.to_thread(_warm)
+            return
+        start = time.monotonic()
+        await asyncio.gather(*(loop.run_in_executor(executor, _warm) for _ in range(self.workers)))
+        logger.info(f"Started {self.workers} document workers in {time.monotonic() - start:.2f}s")
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, task: str, *args):
+        slots = self._slots()
+        start = time.monotonic()
+        async with slots:
+            DOCUMENT_POOL_WAIT_SECONDS.observe(time.monotonic() - start)
+            executor = self._get_executor()
+            if executor is None:
+                return await asyncio.to_thread(_execute, task, *args)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, _execute, task, *args)
+            except BrokenProcessPool:
+                # a worker died (e.g. out of memory); replace the pool for the next task
+                logger.error(f"Document worker died while running {task}, restarting the pool")
+                self.stop()
+                raise
+
+
+document_pool = DocumentPool()
@@ -6,12 +6,23 @@ if [ -n "$SPACE_ID" ]; then
 else
     HOST="localhost"
 fi
+READY_TIMEOUT="${READY_TIMEOUT:-60}"
 
 # start fastapi in background
 uvicorn src.api:app --host $HOST --port 8000 &
+API_PID=$!
 
-# wait for api to be ready
-sleep 3
+# wait until the api reports ready instead of a fixed sleep
+for _ in $(seq $((READY_TIMEOUT * 5))); do
+    if ! kill -0 $API_PID 2>/dev/null; then
+        echo "API exited during startup" >&2
+        exit 1
+    fi
+    if python -c "import urllib.request; urllib.request.urlopen('http://localhost:8000/ready', timeout=1)" 2>/dev/null; then
+        break
+    fi
+    sleep 0.2
+done
 
 # start streamlit on port 7860
 streamlit run src/frontend.py --server.port 7860 --server.address $HOST
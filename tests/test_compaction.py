@@ -0,0 +1,53 @@
+from src.compaction import compact_inputs, dedupe_lines, strip_boilerplate, TRUNCATION_MARKER
+
+REQUIREMENTS = "\n".join([
+    "- 5+ years of Python",
+    "- PostgreSQL and Redis in production",
+    "- Designing REST and event-driven APIs",
+    "- Kubernetes and Terraform",
+    "- Mentoring other engineers",
+])
+
+
+def test_inline_salary_drops_only_that_line():
+    jd = f"Senior Backend Engineer\nLocation: Remote (US)\nSalary: $150,000 - $180,000\n{REQUIREMENTS}"
+    _, compacted, _ = compact_inputs("", jd)
+    assert "Salary" not in compacted
+    assert compacted == f"Senior Backend Engineer\nLocation: Remote (US)\n{REQUIREMENTS}"
+
+
+def test_sentences_starting_with_boilerplate_words_are_kept():
+    jd = f"Benefits include equity for everyone\nPrivacy engineering experience required\n{REQUIREMENTS}"
+    assert strip_boilerplate(jd) == jd
+
+
+def test_boilerplate_heading_skips_its_section():
+    jd = f"Requirements:\n{REQUIREMENTS}\nWhat we offer:\n- Unlimited PTO\n- Free lunch\nNice to have:\n- Go"
+    assert strip_boilerplate(jd) == f"Requirements:\n{REQUIREMENTS}\nNice to have:\n- Go"
+
+
+def test_job_description_is_never_emptied():
+    jd = "Benefits:\nBenefits include equity for everyone and a great team"
+    _, compacted, _ = compact_inputs("", jd)
+    assert compacted == jd
+
+
+def test_resume_keeps_repeated_bullets_of_different_roles():
+    bullet = "- Built CI/CD pipelines with GitHub Actions and Docker"
+    resume = f"Engineer, Acme\n{bullet}\nEngineer, Globex\n{bullet}\n{bullet}"
+    compacted, _, _ = compact_inputs(resume, "")
+    assert compacted == f"Engineer, Acme\n{bullet}\nEngineer, Globex\n{bullet}"
+
+
+def test_job_description_dedupe_drops_repeats_anywhere():
+    line = "Experience with distributed systems at scale"
+    assert dedupe_lines(f"{line}\nPython\n{line}") == f"{line}\nPython"
+
+
+def test_single_line_job_description_is_cut_not_dropped():
+    jd = " ".join(f"Experience with system {i} in production." for i in range(400))
+    _, compacted, stats = compact_inputs("", jd, budget=200)
+    head, marker = compacted.split("\n")
+    assert marker == TRUNCATION_MARKER
+    assert jd.startswith(head)
+    assert 150 < stats["job_description_tokens"] <= 200
@@ -0,0 +1,61 @@
+import json
+
+from src.resume_patch import apply_patch
+from src.streaming import PatchSectionParser
+
+RESUME = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "professional_summary": "Backend engineer",
+    "work_experience": [
+        {"company": "Acme", "bullets": ["Built APIs"]},
+        {"company": "Globex", "bullets": ["Ran on-call"]},
+    ],
+    "skills": ["Python"],
+    "education": [{"degree": "BSc"}],
+}
+
+PATCH = {
+    "professional_summary": "Backend engineer for data platforms",
+    "work_experience": [{"index": 1, "bullets": ["Ran on-call for Kafka"]}],
+    "skills": ["Python", "Kafka"],
+}
+
+
+def feed_in_chunks(parser: PatchSectionParser, text: str, size: int = 7) -> list:
+    events = []
+    for start in range(0, len(text), size):
+        events += parser.feed(text[start:start + size])
+    return events
+
+
+def rebuild(events: list) -> dict:
+    resume = {}
+    for event, data in events:
+        if event == "section" and data["section"] == "header":
+            resume.update(data["data"])
+        elif event == "section":
+            resume[data["section"]] = data["data"]
+        else:
+            entries = resume.setdefault(data["section"], [])
+            entries.extend([None] * (data["index"] + 1 - len(entries)))
+            entries[data["index"]] = data["data"]
+    return resume
+
+
+def test_patched_entries_are_sent_merged_as_they_complete():
+    parser = PatchSectionParser(RESUME)
+    events = feed_in_chunks(parser, json.dumps(PATCH))
+    assert [(event, data["section"]) for event, data in events] == [
+        ("section", "professional_summary"), ("item", "work_experience"), ("section", "skills"),
+    ]
+    assert events[1][1] == {"section": "work_experience", "index": 1, "data": {"company": "Globex", "bullets": ["Ran on-call for Kafka"]}}
+
+
+def test_rest_completes_the_merged_resume():
+    parser = PatchSectionParser(RESUME)
+    events = feed_in_chunks(parser, json.dumps(PATCH))
+    rest = parser.rest()
+    assert parser.result() == apply_patch(RESUME, PATCH)
+    assert rebuild(events + rest) == parser.result()
+    assert ("item", {"section": "work_experience", "index": 1, "data": parser.result()["work_experience"][1]}) not in rest